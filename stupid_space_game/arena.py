@@ -0,0 +1,183 @@
+import argparse
+import functools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Deque, List, NamedTuple, Optional, Tuple
+import numpy as np
+from stupid_space_game.constants import ARENA_MATCHES, ARENA_MAX_TICKS, ARENA_CHUNK, ARENA_MANA_SAMPLE_TICKS, TICK_RATE, FULL_MANA
+from stupid_space_game.bot import Bot, BOT_LEVELS, bot_level
+from stupid_space_game.controls import mask_world_control, player_shoot_check
+from stupid_space_game.missile_logic import grain_start, score_shot
+from stupid_space_game.world import World, WorldSnapshot
+
+TIMEOUT = -1
+TIE = 2
+
+
+class MatchResult(NamedTuple):
+    seed: int
+    winner: int
+    ticks: int
+    hits: Tuple[int, int]
+    shots: Tuple[int, int]
+    mana: Tuple[bytes, bytes]
+
+
+def line_of_fire(world: World, shooter: int) -> Tuple[float, Optional[float]]:
+    target = world.rockets[1 - shooter]
+    muzzle = grain_start(world.rockets[shooter].position, target.position)
+    line = target.position - muzzle
+    blocker = world.raycast(muzzle, line, line.length())
+    return line.length(), blocker[0] if blocker is not None else None
+
+
+def missile_shot(world: World, shooter: int, guess: int, length: float, blocked_length: Optional[float]) -> float:
+    target = world.rockets[1 - shooter]
+    world.rockets[shooter].mana = 0
+    damage = score_shot(length, guess, blocked_length)[1]
+    target.hp = max(0, target.hp - damage)
+    return damage
+
+
+class Arena:
+    def __init__(self, levels: Tuple[str, str]) -> None:
+        self.levels = [bot_level(name) for name in levels]
+        self.world = World(headless=True)
+        self.start: WorldSnapshot = self.world.snapshot()
+
+    def play(self, seed: int) -> MatchResult:
+        world = self.world
+        world.restore(self.start)
+        bots = [Bot(player, level, seed * len(self.levels) + player) for player, level in enumerate(self.levels)]
+        hits = [0, 0]
+        shots = [0, 0]
+        mana: List[bytearray] = [bytearray(), bytearray()]
+        while world.ticks < ARENA_MAX_TICKS:
+            masks = [bot.decide(world) for bot in bots]
+            shoot = player_shoot_check(masks, world)
+            if shoot is not None:
+                shooter = shoot - 1
+                shots[shooter] += 1
+                length, blocked_length = line_of_fire(world, shooter)
+                if missile_shot(world, shooter, bots[shooter].guess(length), length, blocked_length) > 0:
+                    hits[shooter] += 1
+            else:
+                hp = [rocket.hp for rocket in world.rockets]
+                mask_world_control(masks, world)
+                world.update()
+                for player, rocket in enumerate(world.rockets):
+                    if rocket.hp < hp[player]:
+                        hits[1 - player] += 1
+                if world.ticks % ARENA_MANA_SAMPLE_TICKS == 0:
+                    for curve, rocket in zip(mana, world.rockets):
+                        curve.append(int(rocket.mana))
+            if any(rocket.hp <= 0 for rocket in world.rockets):
+                break
+        return MatchResult(
+            seed, self.winner(), world.ticks, (hits[0], hits[1]), (shots[0], shots[1]), (bytes(mana[0]), bytes(mana[1])),
+        )
+
+    def winner(self) -> int:
+        dead = [rocket.hp <= 0 for rocket in self.world.rockets]
+        if all(dead):
+            return TIE
+        if any(dead):
+            return dead.index(False)
+        return TIMEOUT
+
+
+@functools.lru_cache(maxsize=None)
+def worker_arena(levels: Tuple[str, str]) -> Arena:
+    return Arena(levels)
+
+
+def play_chunk(levels: Tuple[str, str], seeds: List[int]) -> List[MatchResult]:
+    arena = worker_arena(levels)
+    return [arena.play(seed) for seed in seeds]
+
+
+class Tally:
+    def __init__(self) -> None:
+        self.matches = 0
+        self.wins = [0, 0]
+        self.ties = 0
+        self.timeouts = 0
+        self.ticks: Deque[int] = deque()
+        self.hits = np.zeros(2, dtype=np.int64)
+        self.shots = np.zeros(2, dtype=np.int64)
+        self.full_mana_ticks: List[Deque[int]] = [deque(), deque()]
+
+    def add(self, result: MatchResult) -> None:
+        self.matches += 1
+        if result.winner == TIE:
+            self.ties += 1
+        elif result.winner == TIMEOUT:
+            self.timeouts += 1
+        else:
+            self.wins[result.winner] += 1
+        self.ticks.append(result.ticks)
+        self.hits += result.hits
+        self.shots += result.shots
+        for curve, full in zip(result.mana, self.full_mana_ticks):
+            if int(FULL_MANA) in curve:
+                full.append((curve.index(int(FULL_MANA)) + 1) * ARENA_MANA_SAMPLE_TICKS)
+
+    def report(self, levels: Tuple[str, str], elapsed: float) -> str:
+        lines = [
+            f"{self.matches} matches in {elapsed:.1f} s ({self.matches / elapsed:.1f} matches/s, "
+            f"{sum(self.ticks) / elapsed:.0f} ticks/s)",
+            f"mean duration {np.mean(self.ticks) / TICK_RATE:.1f} s, "
+            f"{self.ties} ties, {self.timeouts} timeouts",
+        ]
+        for player, level in enumerate(levels):
+            first_full = np.mean(self.full_mana_ticks[player]) / TICK_RATE if self.full_mana_ticks[player] else float('nan')
+            lines.append(
+                f"player {player + 1} ({level}): {self.wins[player] / self.matches:.1%} wins, "
+                f"{self.hits[player] / self.matches:.2f} hits and {self.shots[player] / self.matches:.2f} missile shots per match, "
+                f"first full mana after {first_full:.1f} s"
+            )
+        return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    levels = [level.name for level in BOT_LEVELS]
+    parser = argparse.ArgumentParser(description="Triangles in Space! bot-vs-bot arena")
+    parser.add_argument('--matches', type=int, default=ARENA_MATCHES, help="number of matches to play")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes to play them on")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first match; match N uses seed + N")
+    parser.add_argument('--levels', nargs=2, default=('normal', 'normal'), choices=levels, help="bot difficulty of players 1 and 2")
+    parser.add_argument('--output', default=None, help="write one JSON line per match to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    levels = tuple(args.levels)
+    seeds = list(range(args.seed, args.seed + args.matches))
+    chunks = [seeds[start:start + ARENA_CHUNK] for start in range(0, len(seeds), ARENA_CHUNK)]
+    output = open(args.output, 'w') if args.output is not None else None
+    tally = Tally()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as executor:
+        pending = {executor.submit(play_chunk, levels, chunk) for chunk in chunks}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    tally.add(result)
+                    if output is not None:
+                        output.write(json.dumps({
+                            'seed': result.seed, 'winner': result.winner, 'ticks': result.ticks,
+                            'hits': result.hits, 'shots': result.shots, 'mana': [list(curve) for curve in result.mana],
+                        }) + "\n")
+            print(f"{tally.matches}/{len(seeds)} matches played")
+    if output is not None:
+        output.close()
+    print(tally.report(levels, time.perf_counter() - started))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import math
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional
+import numpy as np
+from stupid_space_game.constants import THRUST_ACCEL, MISSILE_GRAIN, ROCKET_RADIUS, COAST_SPEED, COAST_DRAG, MANA_GAIN, FULL_MANA
+from stupid_space_game.constants import BOT_AIM_DEGREES, BOT_AIM_RANGE, BOT_ROLLOUT_STRIDE, BOT_WINDOW_DISTANCE
+from stupid_space_game.constants import BOT_SHOT_BONUS, BOT_MANA_WEIGHT, BOT_RANGE_WEIGHT, BOT_SPEED_WEIGHT
+from stupid_space_game.inputs import UP, DOWN, LEFT, RIGHT, FIRE
+from stupid_space_game.world import World
+
+STRIDE_THRUST_TRAVEL = BOT_ROLLOUT_STRIDE * (BOT_ROLLOUT_STRIDE + 1) / 2
+
+THRUST_MASKS = np.array([
+    0,
+    1 << UP, 1 << DOWN, 1 << LEFT, 1 << RIGHT,
+    1 << UP | 1 << LEFT, 1 << UP | 1 << RIGHT, 1 << DOWN | 1 << LEFT, 1 << DOWN | 1 << RIGHT,
+])
+THRUST_VECTORS = np.array([
+    (0, 0),
+    (0, -1), (0, 1), (-1, 0), (1, 0),
+    (-1, -1), (1, -1), (-1, 1), (1, 1),
+], dtype=float) * THRUST_ACCEL
+
+
+class BotLevel(NamedTuple):
+    name: str
+    candidates: int
+    horizon: int
+    replan_ticks: int
+    guess_spread: float
+
+
+BOT_LEVELS: List[BotLevel] = [
+    BotLevel("easy", 24, 18, 9, 1.0),
+    BotLevel("normal", 64, 30, 6, 0.5),
+    BotLevel("hard", 128, 36, 3, 0.15),
+]
+
+
+def bot_level(name: str) -> BotLevel:
+    return next(level for level in BOT_LEVELS if level.name == name)
+
+
+def in_firing_window(dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    distance = np.hypot(dx, dy)
+    return (
+        (distance > MISSILE_GRAIN) & (distance < 10 * MISSILE_GRAIN + 1) &
+        (np.abs(dx) > MISSILE_GRAIN - 1) & (np.abs(dy) > MISSILE_GRAIN - 1)
+    )
+
+
+class Bot:
+    def __init__(self, player: int, level: BotLevel, seed: Optional[int] = None) -> None:
+        self.player = player
+        self.level = level
+        self.rng = np.random.default_rng(seed)
+        self.plan: Deque[int] = deque()
+        self.decision_ms: Deque[float] = deque(maxlen=300)
+
+    def decide(self, world: World) -> int:
+        start = time.perf_counter()
+        if len(self.plan) <= self.level.horizon - self.level.replan_ticks:
+            self.replan(world)
+        mask = int(THRUST_MASKS[self.plan.popleft()])
+        if self.wants_fire(world):
+            mask |= 1 << FIRE
+        self.decision_ms.append((time.perf_counter() - start) * 1000.0)
+        return mask
+
+    def candidates(self) -> np.ndarray:
+        count, steps = self.level.candidates, self.level.horizon // BOT_ROLLOUT_STRIDE
+        first = self.rng.integers(len(THRUST_MASKS), size=count)
+        second = self.rng.integers(len(THRUST_MASKS), size=count)
+        switch = self.rng.integers(1, steps + 1, size=count)
+        choices = np.where(np.arange(steps) < switch[:, np.newaxis], first[:, np.newaxis], second[:, np.newaxis])
+        choices[0] = 0
+        if self.plan:
+            kept = list(self.plan)[::BOT_ROLLOUT_STRIDE][:steps]
+            choices[1, :len(kept)] = kept
+            choices[1, len(kept):] = kept[-1]
+        return choices
+
+    def replan(self, world: World) -> None:
+        level = self.level
+        rocket = world.rockets[self.player]
+        opponent = world.rockets[1 - self.player]
+        choices = self.candidates()
+        steps = choices.shape[1]
+        thrusts = THRUST_VECTORS[choices.T]
+        centers, orbit_velocities = world.future_orbits(steps, BOT_ROLLOUT_STRIDE)
+        reach = ROCKET_RADIUS + world.celestial_radii
+        origin = np.array(world.bounds.topleft, dtype=float)
+        size = np.array(world.bounds.size, dtype=float)
+        start = np.array((rocket.position.x, rocket.position.y))
+        horizon = steps * BOT_ROLLOUT_STRIDE
+        travel = rocket.velocity.length() * horizon + THRUST_ACCEL * math.sqrt(2) * horizon * (horizon + 1) / 2
+        if np.all(start - travel > origin) and np.all(start + travel < origin + size):
+            gaps = np.hypot(*(centers - start).transpose(2, 0, 1)).min(axis=0) - reach
+            nearby = np.flatnonzero(gaps < travel)
+            centers, orbit_velocities, reach = centers[:, nearby], orbit_velocities[:, nearby], reach[nearby]
+        reach_squared = reach * reach
+        center_x = np.ascontiguousarray(centers[..., 0])
+        center_y = np.ascontiguousarray(centers[..., 1])
+        position = np.tile(start, (level.candidates, 1))
+        velocity = np.tile((rocket.velocity.x, rocket.velocity.y), (level.candidates, 1))
+        mana = np.full(level.candidates, float(rocket.mana))
+        shot_at = np.full(level.candidates, steps, dtype=float)
+        drift = np.array((opponent.velocity.x, opponent.velocity.y)) * BOT_ROLLOUT_STRIDE
+        target = np.array((opponent.position.x, opponent.position.y))
+        travels = thrusts * STRIDE_THRUST_TRAVEL
+        boosts = thrusts * BOT_ROLLOUT_STRIDE
+        coasting = np.ascontiguousarray(choices.T == 0)
+        coasting_steps = coasting.any(axis=1).tolist()
+        for step in range(steps):
+            if coasting_steps[step]:
+                fast = coasting[step] & (np.einsum('ij,ij->i', velocity, velocity) > COAST_SPEED * COAST_SPEED)
+                velocity[fast] *= COAST_DRAG ** BOT_ROLLOUT_STRIDE
+            position += velocity * BOT_ROLLOUT_STRIDE
+            position += travels[step]
+            velocity += boosts[step]
+            position -= origin
+            np.mod(position, size, out=position)
+            position += origin
+            if len(reach):
+                offset_x = position[:, :1] - center_x[step]
+                offset_y = position[:, 1:] - center_y[step]
+                overlap = offset_x * offset_x + offset_y * offset_y - reach_squared
+                if overlap.min() <= 0:
+                    hit = (overlap <= 0).any(axis=1)
+                    bodies = overlap[hit].argmin(axis=1)
+                    offset = np.stack((offset_x[hit, bodies], offset_y[hit, bodies]), axis=1)
+                    normal = offset / np.maximum(np.hypot(offset[:, 0], offset[:, 1]), 1e-9)[:, np.newaxis]
+                    position[hit] = centers[step, bodies] + normal * reach[bodies][:, np.newaxis]
+                    impulse = np.einsum('ij,ij->i', velocity[hit] + orbit_velocities[step, bodies], normal)
+                    mana[hit] = np.minimum(FULL_MANA, mana[hit] + np.abs(impulse) * MANA_GAIN)
+                    velocity[hit] -= normal * np.minimum(impulse, 0.0)[:, np.newaxis] * 2
+            target = target + drift
+            charged = mana >= FULL_MANA
+            if charged.any():
+                aim = position - target
+                ready = charged & in_firing_window(aim[:, 0], aim[:, 1])
+                shot_at = np.where(ready & (shot_at == steps), step, shot_at)
+        distance = np.hypot(*(position - target).T)
+        speed = np.hypot(*velocity.T)
+        score = (
+            BOT_MANA_WEIGHT * mana
+            + BOT_SHOT_BONUS * (1.0 - shot_at / steps)
+            - BOT_RANGE_WEIGHT * np.abs(distance - BOT_WINDOW_DISTANCE) * (mana >= FULL_MANA)
+            - BOT_SPEED_WEIGHT * np.maximum(speed - COAST_SPEED, 0.0)
+        )
+        best = int(score.argmax())
+        self.plan = deque(np.repeat(choices[best], BOT_ROLLOUT_STRIDE).tolist())
+
+    def wants_fire(self, world: World) -> bool:
+        rocket = world.rockets[self.player]
+        opponent = world.rockets[1 - self.player]
+        offset = opponent.position - rocket.position
+        if rocket.mana >= FULL_MANA:
+            return bool(in_firing_window(np.array(-offset.x), np.array(-offset.y)))
+        if rocket.fire_cooldown > 0 or offset.length() > BOT_AIM_RANGE:
+            return False
+        heading = math.degrees(math.atan2(offset.x, -offset.y))
+        return abs((heading - rocket.rotation + 180) % 360 - 180) < BOT_AIM_DEGREES
+
+    def guess(self, true_length: float) -> int:
+        true_grains = true_length / MISSILE_GRAIN
+        return int(np.clip(round(true_grains + self.rng.normal(0.0, self.level.guess_spread)), 1, 10))
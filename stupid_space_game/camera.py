@@ -0,0 +1,95 @@
+from typing import List, NamedTuple, Optional, Tuple
+import numpy as np
+import pygame
+from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, CAMERA_ZOOM_LEVELS, CAMERA_MARGIN, CAMERA_SMOOTHING
+import stupid_space_game.graphics as graphics
+
+Viewport = Tuple[float, float, float, float]
+
+
+def visible_boxes(borders: np.ndarray, viewport: Viewport) -> np.ndarray:
+    left, top, right, bottom = viewport
+    return (
+        (borders[:, 2] >= left) & (borders[:, 0] <= right) &
+        (borders[:, 3] >= top) & (borders[:, 1] <= bottom)
+    )
+
+
+def visible_rings(centers: np.ndarray, radii: np.ndarray, viewport: Viewport) -> np.ndarray:
+    left, top, right, bottom = viewport
+    nearest_x = np.clip(centers[:, 0], left, right) - centers[:, 0]
+    nearest_y = np.clip(centers[:, 1], top, bottom) - centers[:, 1]
+    farthest_x = np.maximum(np.abs(centers[:, 0] - left), np.abs(centers[:, 0] - right))
+    farthest_y = np.maximum(np.abs(centers[:, 1] - top), np.abs(centers[:, 1] - bottom))
+    return (nearest_x ** 2 + nearest_y ** 2 <= radii ** 2) & (farthest_x ** 2 + farthest_y ** 2 >= radii ** 2)
+
+
+class Camera:
+    def __init__(self, bounds: pygame.Rect, width: int = SCREEN_WIDTH, height: int = SCREEN_HEIGHT) -> None:
+        self.bounds = bounds
+        self.width = width
+        self.height = height
+        self.center = pygame.math.Vector2(bounds.center)
+        self.zoom = CAMERA_ZOOM_LEVELS[0]
+        self.fixed = bounds.width <= width and bounds.height <= height
+
+    def fitting_zoom(self, span_x: float, span_y: float) -> float:
+        for zoom in CAMERA_ZOOM_LEVELS:
+            if (span_x + 2 * CAMERA_MARGIN) * zoom <= self.width and (span_y + 2 * CAMERA_MARGIN) * zoom <= self.height:
+                return zoom
+        return CAMERA_ZOOM_LEVELS[-1]
+
+    def frame(self, targets: List[pygame.math.Vector2], snap: bool = False) -> None:
+        if self.fixed:
+            return
+        left = min(target.x for target in targets)
+        right = max(target.x for target in targets)
+        top = min(target.y for target in targets)
+        bottom = max(target.y for target in targets)
+        self.zoom = self.fitting_zoom(right - left, bottom - top)
+        goal = pygame.math.Vector2((left + right) / 2, (top + bottom) / 2)
+        self.center += (goal - self.center) * (1.0 if snap else CAMERA_SMOOTHING)
+        self.center.x = self.clamp(self.center.x, self.bounds.left, self.bounds.right, self.width / self.zoom)
+        self.center.y = self.clamp(self.center.y, self.bounds.top, self.bounds.bottom, self.height / self.zoom)
+
+    def clamp(self, center: float, low: float, high: float, extent: float) -> float:
+        if high - low <= extent:
+            return (low + high) / 2
+        return min(max(center, low + extent / 2), high - extent / 2)
+
+    def origin(self) -> Tuple[float, float]:
+        return self.center.x - self.width / self.zoom / 2, self.center.y - self.height / self.zoom / 2
+
+    def viewport(self) -> Viewport:
+        left, top = self.origin()
+        return left, top, left + self.width / self.zoom, top + self.height / self.zoom
+
+    def apply(self, view: graphics.View) -> graphics.View:
+        camera_x, camera_y = self.origin()
+        return view._replace(scale=view.scale * self.zoom, camera_x=camera_x, camera_y=camera_y)
+
+    def to_display(self, position: pygame.math.Vector2) -> pygame.math.Vector2:
+        camera_x, camera_y = self.origin()
+        return pygame.math.Vector2((position.x - camera_x) * self.zoom, (position.y - camera_y) * self.zoom)
+
+    def to_world(self, position: pygame.math.Vector2) -> pygame.math.Vector2:
+        camera_x, camera_y = self.origin()
+        return pygame.math.Vector2(position.x / self.zoom + camera_x, position.y / self.zoom + camera_y)
+
+
+class Pane(NamedTuple):
+    camera: Camera
+    rect: pygame.Rect
+    rocket: Optional[int]
+
+
+def shared_pane(bounds: pygame.Rect) -> Pane:
+    return Pane(Camera(bounds), pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT), None)
+
+
+def split_panes(bounds: pygame.Rect, players: int = 2) -> List[Pane]:
+    width = SCREEN_WIDTH // players
+    return [
+        Pane(Camera(bounds, width, SCREEN_HEIGHT), pygame.Rect(player * width, 0, width, SCREEN_HEIGHT), player)
+        for player in range(players)
+    ]
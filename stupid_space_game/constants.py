@@ -9,23 +9,105 @@ import pygame
 SCREEN_WIDTH = 2560
 SCREEN_HEIGHT = 1440
 FPS = 60
+# Rate of the main loop in ticks per second; one tick is the frame budget.
+TICK_RATE = 30
+
+# --- Render resolution ---
+# Fraction of the screen resolution the world is rasterized at before it is upscaled.
+RENDER_SCALE = 1.0
+# Scales the adaptive render resolution mode steps between, lowest first.
+RENDER_SCALE_LEVELS = (0.5, 0.75, 1.0)
+# Number of frames averaged before the adaptive mode reconsiders the scale.
+RENDER_SCALE_WINDOW = 60
+# Share of the frame budget spent working above which the scale steps down...
+RENDER_SCALE_DOWN_LOAD = 0.9
+# ...and below which it steps back up.
+RENDER_SCALE_UP_LOAD = 0.5
+
+# --- Quality governor ---
+# Number of frames averaged before the governor reconsiders the quality level.
+QUALITY_WINDOW = 90
+# Share of the frame budget spent working above which the next feature is shed...
+QUALITY_DEGRADE_LOAD = 0.9
+# ...and below which the last shed feature is restored.
+QUALITY_RESTORE_LOAD = 0.5
+
+
+# --- World and camera ---
+# Size of the wrap-around world in large-world mode as a multiple of the screen, centred on the star.
+LARGE_WORLD_SCREENS = 4
+# Zoom steps the camera picks from, closest first; it uses the closest one that frames both rockets.
+CAMERA_ZOOM_LEVELS = (1.0, 0.75, 0.5, 0.35, 0.25)
+# World-space padding kept between the framed rockets and the screen edge.
+CAMERA_MARGIN = 300
+# Fraction of the distance to the rockets' midpoint the camera moves each frame.
+CAMERA_SMOOTHING = 0.15
+# World-space padding around the viewport within which small sprites (particles, missiles) are still drawn.
+SPRITE_CULL_MARGIN = 64
+# Colour (RGBA) of the orbit rings drawn beneath the orbiting bodies.
+ORBIT_RING_COLOR = (255, 255, 255, 34)
+# Line width of the orbit rings in screen pixels at zoom 1.0.
+ORBIT_RING_WIDTH = 3
+# Colour of the vertical line between split-screen panes.
+PANE_DIVIDER_COLOR = (200, 200, 200)
+# Width in pixels of the line between split-screen panes.
+PANE_DIVIDER_WIDTH = 2
+
+# --- Star corona ---
+# Ticks one full corona animation cycle lasts; the baked frames are spread evenly over it.
+CORONA_CYCLE_TICKS = 105
+# Radius in sprite pixels of the corona's glowing core.
+CORONA_BASE_RADIUS = 25
+# How far in sprite pixels the core radius pulses in and out over a cycle.
+CORONA_RADIUS_VARIATION = 10
+# Number of concentric gradient layers between the outer and inner corona colours.
+CORONA_LAYERS = 6
+# Colour of the outermost corona layer.
+CORONA_OUTER_COLOR = (255, 140, 0)
+# Colour of the innermost corona layer.
+CORONA_INNER_COLOR = (255, 255, 150)
+# Colours the flare blobs are picked from.
+CORONA_BLOB_COLORS = [(255, 180, 50), (255, 220, 100), (255, 255, 150)]
+# Number of flare blobs around the star.
+CORONA_BLOBS = 8
+# Range in sprite pixels of how far a blob reaches out from the core.
+CORONA_BLOB_LENGTH = (10, 35)
+# Range in sprite pixels of a blob's width.
+CORONA_BLOB_WIDTH = (4, 8)
+# Range of a blob's height as a multiple of its width.
+CORONA_BLOB_HEIGHT_FACTOR = (0.8, 1.5)
+# Range of how many times a blob is reborn with new dimensions per cycle.
+CORONA_BLOB_LIVES_PER_CYCLE = (2, 4)
+# Distance in sprite pixels outside the core at which blobs spawn.
+CORONA_BLOB_SPAWN_OFFSET = 5
+# Number of gradient layers each blob is drawn with.
+CORONA_BLOB_GRADIENT_LAYERS = 3
+# Farthest reach in sprite pixels of anything the corona draws, which sizes its frames.
+CORONA_EXTENT = CORONA_BASE_RADIUS + CORONA_RADIUS_VARIATION + CORONA_BLOB_LENGTH[1] + CORONA_BLOB_SPAWN_OFFSET + CORONA_BLOB_WIDTH[1]
+# Seed of the blob layout, so every run bakes the same corona.
+CORONA_SEED = 7
 
 
 DEFAULT_HP = 100
 
-# Key mappings
 MISSILE_GRAIN = 75
-PLAYER1_UP = pygame.K_w
-PLAYER1_DOWN = pygame.K_s
-PLAYER1_LEFT = pygame.K_a
-PLAYER1_RIGHT = pygame.K_d
-PLAYER1_FIRE = pygame.K_q
 
-PLAYER2_UP = pygame.K_KP8
-PLAYER2_DOWN = pygame.K_KP2
-PLAYER2_LEFT = pygame.K_KP4
-PLAYER2_RIGHT = pygame.K_KP6
-PLAYER2_FIRE = pygame.K_KP7
+# Key mappings
+# Binding table of (key, player index, action); actions are 'up', 'down', 'left', 'right' and 'fire'.
+KEY_BINDINGS = (
+    (pygame.K_w, 0, 'up'),
+    (pygame.K_s, 0, 'down'),
+    (pygame.K_a, 0, 'left'),
+    (pygame.K_d, 0, 'right'),
+    (pygame.K_q, 0, 'fire'),
+    (pygame.K_KP8, 1, 'up'),
+    (pygame.K_KP2, 1, 'down'),
+    (pygame.K_KP4, 1, 'left'),
+    (pygame.K_KP6, 1, 'right'),
+    (pygame.K_KP7, 1, 'fire'),
+)
+# Number of recent key-event-to-tick latencies kept by the input layer.
+INPUT_LATENCY_WINDOW = 120
 
 COLLISION_BUFFER = 32
 
@@ -49,21 +131,179 @@ ROCKET_HP = 100
 THRUST_ACCEL = 1
 # The minimum time in milliseconds that must pass between firing missiles.
 FIRE_COOLDOWN_MS = 2500
+# FIRE_COOLDOWN_MS in simulation ticks, the unit the rockets count their cooldown down in.
+FIRE_COOLDOWN_TICKS = FIRE_COOLDOWN_MS * TICK_RATE // 1000
+# Speed in pixels per tick above which a rocket that is not thrusting is slowed down by drag.
+COAST_SPEED = 10
+# Velocity factor applied each tick to a coasting rocket faster than COAST_SPEED.
+COAST_DRAG = 0.99
+# Mana gained per unit of collision impulse when a rocket bounces off a celestial body.
+MANA_GAIN = 0.3
+# Mana at which the missile minigame can be triggered; mana is capped here.
+FULL_MANA = 100.0
+
+# --- Bot ---
+# Half-angle in degrees of the cone in front of the bot's nose inside which it fires plain missiles.
+BOT_AIM_DEGREES = 12
+# Farthest opponent distance in pixels at which the bot bothers firing plain missiles.
+BOT_AIM_RANGE = 900
+# Difficulty the --bot flag picks when given without a level: 'easy', 'normal' or 'hard'.
+BOT_LEVEL = 'normal'
+# Ticks each bot rollout step covers; larger strides make replanning cheaper but coarser.
+BOT_ROLLOUT_STRIDE = 3
+# Distance in pixels from the opponent the bot tries to hold while its mana is full, in the middle of the firing window.
+BOT_WINDOW_DISTANCE = 5 * MISSILE_GRAIN
+# Score for a rollout that reaches the firing window with full mana, scaled down the later it gets there.
+BOT_SHOT_BONUS = 400.0
+# Score per point of mana a rollout ends with.
+BOT_MANA_WEIGHT = 2.0
+# Score penalty per pixel a fully charged rollout ends away from BOT_WINDOW_DISTANCE.
+BOT_RANGE_WEIGHT = 0.05
+# Score penalty per pixel per tick a rollout ends above COAST_SPEED.
+BOT_SPEED_WEIGHT = 0.5
 
 # --- Missile ---
 # The constant speed at which missiles travel. Missiles are not affected by thrust.
 MISSILE_SPEED = 42.0
+# Collision radius of a live missile in pixels.
+MISSILE_RADIUS = 8
+# Number of preallocated slots in the live missile pool; firing fails silently when all are in flight.
+MISSILE_POOL_CAPACITY = 1024
+# Velocity-Verlet substeps per tick for missiles curving around the celestial masses.
+# The integrator is symplectic, so a single step per tick stays stable.
+MISSILE_SUBSTEPS = 1
+
+# Whether the world freezes while the shooter plays the missile minigame.
+# When False the world keeps simulating under the minigame overlay.
+MINIGAME_PAUSES_WORLD = True
+# Main loop rate while the frozen world only redraws the minigame's dirty regions.
+MINIGAME_TICK_RATE = 120
+
+# Number of preallocated particle slots; when full, new particles overwrite the oldest ones.
+PARTICLE_CAPACITY = 32768
 
 # Maximum duration in seconds a missile can exist before self-destructing.
 MISSILE_LIFETIME_S = 30.0
 # The amount of HP damage inflicted when a missile hits an opponent's rocket.
 MISSILE_DAMAGE = 25
 
+# --- Netplay ---
+# UDP port player 1 listens on; player 2 listens on the next one.
+NETPLAY_PORT = 47800
+# Ticks a local input waits before it is simulated, hiding that much network latency without any rollback.
+NETPLAY_INPUT_DELAY = 2
+# Furthest the simulation may run ahead of the last confirmed remote input; beyond it the peer stalls.
+NETPLAY_MAX_ROLLBACK = 10
+# Ticks of inputs and snapshots kept in the rollback ring buffers.
+NETPLAY_HISTORY = 64
+# Receive buffer size in bytes for one netplay datagram; a full history of input masks plus the header fits easily.
+NETPLAY_MAX_DATAGRAM = 2048
+
+# --- Match server ---
+# TCP port of the first match server shard; shard N listens N ports above it.
+SERVER_PORT = 47900
+# Number of headless matches a server hosts across all of its shards.
+SERVER_MATCHES = 64
+# Seconds between the per-shard tick cost reports.
+SERVER_REPORT_S = 5
+# Bytes a client may have queued before the server drops it as too slow.
+SERVER_WRITE_BUFFER = 65536
+# Fixed-point steps per pixel for positions in the state stream.
+STREAM_POSITION_STEPS = 4
+# Rocket headings in the state stream are rounded to this many degrees, the rocket sprite's own rotation step.
+STREAM_ROTATION_STEP = 2
+
+# --- Arena ---
+# Number of bot-vs-bot matches the arena plays when not told otherwise.
+ARENA_MATCHES = 1000
+# A match still running after this many ticks is scored as a timeout.
+ARENA_MAX_TICKS = 180 * TICK_RATE
+# Matches handed to a worker per task; larger chunks mean fewer round trips to the aggregator.
+ARENA_CHUNK = 8
+# Ticks between the samples of each rocket's mana curve in the match records.
+ARENA_MANA_SAMPLE_TICKS = TICK_RATE
+
+# --- Training environment ---
+# Episodes still running after this many ticks are truncated.
+ENV_MAX_TICKS = 60 * TICK_RATE
+# Celestial bodies, nearest first, included in each rocket's observation.
+ENV_NEARBY_BODIES = 4
+# Live missile slots per environment in the vectorized environment, enough for both rockets firing on every cooldown
+# for a whole missile lifetime; firing fails silently when all are in flight.
+ENV_MISSILES = 24
+# Factor observations scale pixel positions and offsets by, keeping them near unit range.
+ENV_POSITION_SCALE = 1.0 / 1000.0
+# Factor observations scale velocities in pixels per tick by.
+ENV_VELOCITY_SCALE = 1.0 / 10.0
+
 # --- Collisions ---
 # Scaling factor to determine HP damage from collisions (Rocket-Terrain, Rocket-Rocket).
 # Damage = magnitude of relative velocity * COLLISION_DAMAGE_SCALE
 COLLISION_DAMAGE_SCALE = 0.2
 
+# --- Minimap ---
+# The minimap's moving dots are redrawn once every this many frames; the cached copy is blitted in between.
+MINIMAP_REFRESH = 3
+# Width in pixels of the minimap; its height follows the world's aspect ratio.
+MINIMAP_WIDTH = 384
+# Gap in pixels between the minimap and the bottom-right screen corner.
+MINIMAP_MARGIN = 20
+# Opacity of the minimap (0-255).
+MINIMAP_ALPHA = 210
+# Radius in pixels of the rocket dots on the minimap.
+MINIMAP_ROCKET_RADIUS = 4
+# Minimap background colour.
+COLOR_MINIMAP_BACKGROUND = (10, 10, 25)
+# Colour of the orbit circles on the minimap.
+COLOR_MINIMAP_ORBIT = (70, 70, 90)
+# Colour of the star on the minimap.
+COLOR_MINIMAP_STAR = (255, 200, 60)
+# Colour of the planets and moons on the minimap.
+COLOR_MINIMAP_BODY = (170, 170, 190)
+# Colour of the camera viewport outlines on the minimap.
+COLOR_MINIMAP_VIEWPORT = (120, 120, 120)
+
+# --- Profiling ---
+# Number of recent frames kept for the rolling percentiles, graph and JSON capture.
+PROFILER_WINDOW = 300
+# The profiler overlay text is re-rendered once every this many frames.
+PROFILER_OVERLAY_REFRESH = 15
+# Top-left screen position of the profiler overlay.
+OVERLAY_POSITION = (20, 80)
+# Width in pixels of the profiler overlay and its frame-time graph.
+OVERLAY_WIDTH = 620
+# Height in pixels of one row of stage timings in the overlay.
+OVERLAY_LINE_HEIGHT = 22
+# Height in pixels of the frame-time graph; twice the tick budget fills it.
+OVERLAY_GRAPH_HEIGHT = 120
+# Overlay background colour (RGBA).
+OVERLAY_BACKGROUND = (0, 0, 0, 170)
+# Colour of the overlay text.
+OVERLAY_TEXT_COLOR = (220, 220, 220)
+# Colour of the frame-time bars in the graph.
+OVERLAY_GRAPH_COLOR = (0, 255, 120)
+# Colour of the tick budget line across the graph.
+OVERLAY_BUDGET_COLOR = (255, 80, 80)
+# Most stages listed in the overlay, slowest first.
+OVERLAY_MAX_STAGES = 24
+# Font size of the overlay text.
+OVERLAY_FONT_SIZE = 16
+# X offsets of the stage name, p50, p95 and p99 columns.
+OVERLAY_COLUMNS = (10, 330, 425, 520)
+# Key that writes the current profiler capture to PROFILER_EXPORT_PATH.
+PROFILER_EXPORT_KEY = pygame.K_F10
+PROFILER_EXPORT_PATH = 'profile_capture.json'
+# Number of spans kept in the preallocated trace ring buffer; older spans are overwritten.
+TRACE_CAPACITY = 65536
+# Key that flushes the trace ring buffer to a Trace Event Format JSON file.
+TRACE_FLUSH_KEY = pygame.K_F9
+TRACE_OUTPUT_PATH = 'frame_trace.json'
+# Width in milliseconds of one input-to-photon latency histogram bucket.
+LATENCY_BUCKET_MS = 2
+# Number of histogram buckets; slower presses land in a final overflow bucket.
+LATENCY_BUCKETS = 60
+LATENCY_OUTPUT_PATH = 'input_latency.json'
+
 # --- Game Rules ---
 # The total number of rounds played in a single game.
 MAX_ROUNDS = 5
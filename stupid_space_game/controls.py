@@ -1,49 +1,55 @@
+from typing import Sequence
 from pygame.math import Vector2
-from stupid_space_game.constants import (
-    PLAYER1_UP, PLAYER1_DOWN, PLAYER1_LEFT, PLAYER1_RIGHT,PLAYER1_FIRE,
-    PLAYER2_UP, PLAYER2_DOWN, PLAYER2_LEFT, PLAYER2_RIGHT,PLAYER2_FIRE,
-    THRUST_ACCEL, MISSILE_GRAIN
-)
+from stupid_space_game.constants import THRUST_ACCEL, MISSILE_GRAIN, FULL_MANA
+from stupid_space_game.inputs import InputState, ACTIONS, UP, DOWN, LEFT, RIGHT, FIRE
 from stupid_space_game.world import Rocket
 
-def player1_input_control(keys, rocket: Rocket):
-    thrust = Vector2(0, 0)
-    if keys[PLAYER1_UP]:
-        thrust.y -= THRUST_ACCEL
-    if keys[PLAYER1_DOWN]:
-        thrust.y += THRUST_ACCEL
-    if keys[PLAYER1_LEFT]:
-        thrust.x -= THRUST_ACCEL
-    if keys[PLAYER1_RIGHT]:
-        thrust.x += THRUST_ACCEL
-    rocket.thrust = thrust
-    
 
-    
-def player2_input_control(keys, rocket: Rocket):
+def action_mask(inputs: InputState, player: int) -> int:
+    return sum(1 << action for action in range(ACTIONS) if inputs.active(player, action))
+
+
+def mask_input_control(mask: int, rocket: Rocket):
     thrust = Vector2(0, 0)
-    if keys[PLAYER2_UP]:
+    if mask & (1 << UP):
         thrust.y -= THRUST_ACCEL
-    if keys[PLAYER2_DOWN]:
+    if mask & (1 << DOWN):
         thrust.y += THRUST_ACCEL
-    if keys[PLAYER2_LEFT]:
+    if mask & (1 << LEFT):
         thrust.x -= THRUST_ACCEL
-    if keys[PLAYER2_RIGHT]:
+    if mask & (1 << RIGHT):
         thrust.x += THRUST_ACCEL
     rocket.thrust = thrust
 
 
-def player_shoot_check(keys, world):
-    if (world.rocket1.mana == 100.0 and keys[PLAYER1_FIRE]) or (world.rocket2.mana == 100.0 and keys[PLAYER2_FIRE]): # so that we dont calculate the distance every loop tick
+def mask_world_control(masks: Sequence[int], world):
+    for player, mask in enumerate(masks):
+        mask_input_control(mask, world.rockets[player])
+        if mask & (1 << FIRE):
+            world.fire(player)
+
+
+def player_input_control(inputs: InputState, player: int, rocket: Rocket):
+    mask_input_control(action_mask(inputs, player), rocket)
+
+
+def player_shoot_check(masks: Sequence[int], world):
+    fire1 = world.rocket1.mana == FULL_MANA and bool(masks[0] & (1 << FIRE))
+    fire2 = world.rocket2.mana == FULL_MANA and bool(masks[1] & (1 << FIRE))
+    if fire1 or fire2: # so that we dont calculate the distance every loop tick
         distance = world.rocket1.position.distance_to(world.rocket2.position)
         if MISSILE_GRAIN < distance < 10*MISSILE_GRAIN + 1:
-            print(f"Not too far, not too close, ready to shoot missile")
             if abs(world.rocket1.position.x - world.rocket2.position.x) > MISSILE_GRAIN - 1:
                 if abs(world.rocket1.position.y - world.rocket2.position.y) > MISSILE_GRAIN - 1:    
-                    if (world.rocket1.mana == 100.0 and keys[PLAYER1_FIRE]):
+                    if fire1:
                         return 1
-                    elif (world.rocket2.mana == 100.0 and keys[PLAYER2_FIRE]):
+                    elif fire2:
                         return 2
 
     return None
 
+
+def player_fire_control(masks: Sequence[int], world):
+    for player, mask in enumerate(masks):
+        if mask & (1 << FIRE):
+            world.fire(player)
@@ -0,0 +1,348 @@
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+import pygame
+from stupid_space_game.constants import ROCKET_HP, ROCKET_RADIUS, MISSILE_RADIUS, MISSILE_SPEED, MISSILE_DAMAGE, GRAVITY_FACTOR
+from stupid_space_game.constants import MIN_GRAVITY_DISTANCE_SQ, THRUST_ACCEL, MISSILE_GRAIN, ENV_MAX_TICKS, ENV_NEARBY_BODIES, ENV_MISSILES
+from stupid_space_game.constants import SCREEN_WIDTH, COAST_SPEED, COAST_DRAG, MANA_GAIN, FULL_MANA, FIRE_COOLDOWN_TICKS
+from stupid_space_game.constants import ENV_POSITION_SCALE, ENV_VELOCITY_SCALE
+from stupid_space_game.arena import TIE, TIMEOUT, line_of_fire, missile_shot
+from stupid_space_game.bot import Bot, bot_level, in_firing_window
+from stupid_space_game.controls import mask_world_control, player_shoot_check
+from stupid_space_game.inputs import UP, DOWN, LEFT, RIGHT, FIRE
+from stupid_space_game.missiles import MISSILE_LIFETIME_TICKS
+from stupid_space_game.missile_logic import score_shot
+import stupid_space_game.graphics as graphics
+import stupid_space_game.physics as physics
+import stupid_space_game.ui as ui
+from stupid_space_game.world import World
+
+PLAYERS = 2
+X = 0
+Y = 1
+VX = 2
+VY = 3
+HP = 4
+MANA = 5
+COOLDOWN = 6
+ROTATION = 7
+ROCKET_FIELDS = 8
+BODY_FEATURES = 5
+OBSERVATION_SIZE = 16 + BODY_FEATURES * ENV_NEARBY_BODIES
+
+
+def rocket_rows(world: World) -> np.ndarray:
+    return np.array([
+        (state.x, state.y, state.vx, state.vy, state.hp, state.mana, state.fire_cooldown, state.rotation)
+        for state in (rocket.state() for rocket in world.rockets)
+    ], dtype=float)
+
+
+def observe(rockets: np.ndarray, centers: np.ndarray, orbit_velocities: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    count = len(rockets)
+    opponents = rockets[:, ::-1]
+    headings = np.radians(rockets[..., ROTATION])
+    observation = np.empty((count, PLAYERS, OBSERVATION_SIZE), dtype=np.float32)
+    observation[..., 0:2] = rockets[..., X:Y + 1] * ENV_POSITION_SCALE
+    observation[..., 2:4] = rockets[..., VX:VY + 1] * ENV_VELOCITY_SCALE
+    observation[..., 4] = rockets[..., HP] / ROCKET_HP
+    observation[..., 5] = rockets[..., MANA] / FULL_MANA
+    observation[..., 6] = rockets[..., COOLDOWN] / FIRE_COOLDOWN_TICKS
+    observation[..., 7] = np.sin(headings)
+    observation[..., 8] = np.cos(headings)
+    observation[..., 9:11] = (opponents[..., X:Y + 1] - rockets[..., X:Y + 1]) * ENV_POSITION_SCALE
+    observation[..., 11:13] = (opponents[..., VX:VY + 1] - rockets[..., VX:VY + 1]) * ENV_VELOCITY_SCALE
+    observation[..., 13] = opponents[..., HP] / ROCKET_HP
+    observation[..., 14] = opponents[..., MANA] / FULL_MANA
+    observation[..., 15] = opponents[..., COOLDOWN] / FIRE_COOLDOWN_TICKS
+    offset_x = np.ascontiguousarray(centers[..., 0])[:, np.newaxis] - rockets[..., X, np.newaxis]
+    offset_y = np.ascontiguousarray(centers[..., 1])[:, np.newaxis] - rockets[..., Y, np.newaxis]
+    gaps = np.sqrt(offset_x * offset_x + offset_y * offset_y) - radii
+    nearest = np.argpartition(gaps, ENV_NEARBY_BODIES - 1, axis=2)[..., :ENV_NEARBY_BODIES]
+    nearest = np.take_along_axis(nearest, np.take_along_axis(gaps, nearest, axis=2).argsort(axis=2), axis=2)
+    bodies = observation[..., 16:].reshape(count, PLAYERS, ENV_NEARBY_BODIES, BODY_FEATURES)
+    bodies[..., 0] = np.take_along_axis(offset_x, nearest, axis=2) * ENV_POSITION_SCALE
+    bodies[..., 1] = np.take_along_axis(offset_y, nearest, axis=2) * ENV_POSITION_SCALE
+    bodies[..., 2] = radii[nearest] * ENV_POSITION_SCALE
+    rows = np.arange(count)[:, np.newaxis, np.newaxis]
+    bodies[..., 3:5] = orbit_velocities[rows, nearest] * ENV_VELOCITY_SCALE
+    return observation
+
+
+class GravitationalDuelEnv:
+    def __init__(self, opponent: Optional[str] = None, render_mode: Optional[str] = None) -> None:
+        self.world = World(headless=True)
+        self.start = self.world.snapshot()
+        self.opponent_level = bot_level(opponent) if opponent is not None else None
+        self.opponent: Optional[Bot] = None
+        self.render_mode = render_mode
+        self.display: Optional[Tuple[Any, ...]] = None
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        self.world.restore(self.start)
+        if self.opponent_level is not None:
+            self.opponent = Bot(1, self.opponent_level, seed)
+        return self.observe(), {}
+
+    def step(self, action: Sequence[int]) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        world = self.world
+        mask, guess = int(action[0]), int(action[1])
+        masks = [mask, self.opponent.decide(world) if self.opponent is not None else 0]
+        hp = [rocket.hp for rocket in world.rockets]
+        shoot = player_shoot_check(masks, world)
+        info: Dict[str, Any] = {}
+        if shoot is not None:
+            shooter = shoot - 1
+            length, blocked_length = line_of_fire(world, shooter)
+            if shooter == 0:
+                shot_guess = guess
+            else:
+                shot_guess = self.opponent.guess(length)
+            info['missile_damage'] = missile_shot(world, shooter, int(np.clip(shot_guess, 1, 10)), length, blocked_length)
+        else:
+            mask_world_control(masks, world)
+            world.update()
+        reward = ((hp[1] - world.rocket2.hp) - (hp[0] - world.rocket1.hp)) / ROCKET_HP
+        terminated = world.rocket1.hp <= 0 or world.rocket2.hp <= 0
+        truncated = not terminated and world.ticks >= ENV_MAX_TICKS
+        if self.render_mode == 'human':
+            self.render()
+        return self.observe(), reward, terminated, truncated, info
+
+    def observe(self) -> np.ndarray:
+        world = self.world
+        return observe(
+            rocket_rows(world)[np.newaxis], world.celestial_centers()[np.newaxis],
+            world.orbit_velocities()[np.newaxis], world.celestial_radii,
+        )[0, 0]
+
+    def render(self) -> None:
+        if self.display is None:
+            screen = graphics.init_graphics()
+            ui.ui_init()
+            world = World(self.world.bounds)
+            self.display = (screen, world, graphics.BackgroundGraphics(), ui.FighterHud(SCREEN_WIDTH, len(world.rockets)))
+        screen, world, background, hud = self.display
+        pygame.event.pump()
+        world.restore(self.world.snapshot())
+        background.update(graphics.FULL_VIEW)
+        background.draw(screen, graphics.FULL_VIEW)
+        world.draw(screen)
+        hud.draw(screen, world.rockets)
+        pygame.display.update()
+
+    def close(self) -> None:
+        if self.display is not None:
+            pygame.quit()
+            self.display = None
+
+
+class VectorDuelEnv:
+    def __init__(self, count: int) -> None:
+        world = World(headless=True)
+        self.count = count
+        self.origin = np.array(world.bounds.topleft, dtype=float)
+        self.far = np.array(world.bounds.bottomright, dtype=float)
+        self.size = np.array(world.bounds.size, dtype=float)
+        self.start_rockets = rocket_rows(world)
+        self.start_angles = np.array(world.start_angles)
+        self.fixed_centers = world.celestial_centers()
+        self.parent_indices = world.parent_indices
+        self.orbit_depth = world.orbit_depth
+        self.orbit_radii = world.all_orbit_radii
+        self.orbit_speeds = world.orbit_speeds
+        self.masses = world.celestial_masses
+        self.radii = world.celestial_radii
+        self.reach_squared = (ROCKET_RADIUS + self.radii) ** 2
+        self.ticks = np.zeros(count, dtype=np.int64)
+        self.rockets = np.tile(self.start_rockets, (count, 1, 1))
+        self.missile_position = np.zeros((count, ENV_MISSILES, 2))
+        self.missile_velocity = np.zeros((count, ENV_MISSILES, 2))
+        self.missile_acceleration = np.zeros((count, ENV_MISSILES, 2))
+        self.missile_age = np.zeros((count, ENV_MISSILES), dtype=np.int32)
+        self.missile_owner = np.zeros((count, ENV_MISSILES), dtype=np.int8)
+        self.missile_alive = np.zeros((count, ENV_MISSILES), dtype=bool)
+        self.centers, self.orbit_velocities = self.orbits(self.ticks)
+
+    def orbits(self, ticks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        unique, inverse = np.unique(ticks, return_inverse=True)
+        angles = self.start_angles + unique[:, np.newaxis] * self.orbit_speeds
+        directions = np.stack((np.cos(angles), np.sin(angles)), axis=-1)
+        offsets = directions * self.orbit_radii[:, np.newaxis]
+        moving = self.parent_indices >= 0
+        centers = offsets.copy()
+        centers[:, ~moving] = self.fixed_centers[~moving]
+        for _ in range(self.orbit_depth):
+            centers[:, moving] = offsets[:, moving] + centers[:, self.parent_indices[moving]]
+        velocities = directions * (self.orbit_speeds * self.orbit_radii)[:, np.newaxis]
+        return centers[inverse], velocities[inverse]
+
+    def reset(self, envs: Optional[np.ndarray] = None) -> np.ndarray:
+        envs = np.arange(self.count) if envs is None else envs
+        self.ticks[envs] = 0
+        self.rockets[envs] = self.start_rockets
+        self.missile_alive[envs] = False
+        self.missile_owner[envs] = 0
+        self.centers, self.orbit_velocities = self.orbits(self.ticks)
+        return self.observe()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        masks = actions[..., 0].astype(np.int64)
+        hp = self.rockets[..., HP].copy()
+        shooters = self.missile_shots(masks, actions[..., 1])
+        running = shooters < 0
+        envs = slice(None) if running.all() else np.flatnonzero(running)
+        self.fire((masks & (1 << FIRE) != 0) & running[:, np.newaxis])
+        self.ticks += running
+        self.centers, self.orbit_velocities = self.orbits(self.ticks)
+        self.move_rockets(masks[envs], envs)
+        self.collide_rockets(envs)
+        self.update_missiles(running)
+        lost = hp - self.rockets[..., HP]
+        rewards = (lost[:, ::-1] - lost) / ROCKET_HP
+        dead = self.rockets[..., HP] <= 0
+        terminated = dead.any(axis=1)
+        truncated = ~terminated & (self.ticks >= ENV_MAX_TICKS)
+        winners = np.where(terminated, np.where(dead.all(axis=1), TIE, dead[:, 0].astype(int)), TIMEOUT)
+        info = {'shooters': shooters, 'winners': winners}
+        done = np.flatnonzero(terminated | truncated)
+        if len(done):
+            info['final_observations'] = self.observe()[done]
+            self.reset(done)
+        return self.observe(), rewards, terminated, truncated, info
+
+    def missile_shots(self, masks: np.ndarray, guesses: np.ndarray) -> np.ndarray:
+        rockets = self.rockets
+        charged = (rockets[..., MANA] >= FULL_MANA) & (masks & (1 << FIRE) != 0)
+        shooters = np.full(self.count, -1)
+        if not charged.any():
+            return shooters
+        offset = rockets[:, 0, X:Y + 1] - rockets[:, 1, X:Y + 1]
+        window = in_firing_window(offset[:, 0], offset[:, 1])
+        shooters = np.where(window & charged[:, 0], 0, np.where(window & charged[:, 1], 1, -1))
+        for env in np.flatnonzero(shooters >= 0).tolist():
+            shooter = int(shooters[env])
+            start = rockets[env, shooter, X:Y + 1]
+            target = rockets[env, 1 - shooter, X:Y + 1]
+            muzzle = target + np.floor((start - target) / MISSILE_GRAIN) * MISSILE_GRAIN
+            line = target - muzzle
+            length = float(np.hypot(line[0], line[1]))
+            centers = self.centers[env]
+            borders = np.concatenate((centers - self.radii[:, np.newaxis], centers + self.radii[:, np.newaxis]), axis=1)
+            blocker = physics.raycast(muzzle, line, length, borders, centers, self.radii)
+            guess = int(np.clip(guesses[env, shooter], 1, 10))
+            damage = score_shot(length, guess, blocker[0] if blocker is not None else None)[1]
+            rockets[env, shooter, MANA] = 0
+            rockets[env, 1 - shooter, HP] = max(0, rockets[env, 1 - shooter, HP] - damage)
+        return shooters
+
+    def fire(self, pressed: np.ndarray) -> None:
+        rockets = self.rockets
+        ready = pressed & (rockets[..., COOLDOWN] <= 0)
+        if not ready.any():
+            return
+        for player in range(PLAYERS):
+            envs = np.flatnonzero(ready[:, player])
+            envs = envs[~self.missile_alive[envs].all(axis=1)]
+            if not len(envs):
+                continue
+            slots = self.missile_alive[envs].argmin(axis=1)
+            heading = np.radians(rockets[envs, player, ROTATION])
+            direction = np.stack((np.sin(heading), -np.cos(heading)), axis=1)
+            self.missile_position[envs, slots] = rockets[envs, player, X:Y + 1] + direction * (ROCKET_RADIUS + MISSILE_RADIUS + 1)
+            self.missile_velocity[envs, slots] = rockets[envs, player, VX:VY + 1] + direction * MISSILE_SPEED
+            self.missile_acceleration[envs, slots] = 0.0
+            self.missile_age[envs, slots] = 0
+            self.missile_owner[envs, slots] = player
+            self.missile_alive[envs, slots] = True
+            rockets[envs, player, COOLDOWN] = FIRE_COOLDOWN_TICKS
+
+    def move_rockets(self, masks: np.ndarray, envs: Union[slice, np.ndarray]) -> None:
+        rockets = self.rockets[envs]
+        np.maximum(rockets[..., COOLDOWN] - 1, 0, out=rockets[..., COOLDOWN])
+        thrust_x = (((masks >> RIGHT) & 1) - ((masks >> LEFT) & 1)) * THRUST_ACCEL
+        thrust_y = (((masks >> DOWN) & 1) - ((masks >> UP) & 1)) * THRUST_ACCEL
+        thrusting = (thrust_x != 0) | (thrust_y != 0)
+        velocity = rockets[..., VX:VY + 1]
+        rockets[..., ROTATION] = np.degrees(np.where(
+            thrusting, np.arctan2(thrust_x, -thrust_y), np.arctan2(velocity[..., 0], -velocity[..., 1]),
+        ))
+        speed_squared = velocity[..., 0] ** 2 + velocity[..., 1] ** 2
+        drag = np.where(~thrusting & (speed_squared > COAST_SPEED * COAST_SPEED), COAST_DRAG, 1.0)
+        velocity *= drag[..., np.newaxis]
+        velocity[..., 0] += thrust_x
+        velocity[..., 1] += thrust_y
+        position = rockets[..., X:Y + 1]
+        position += velocity
+        np.copyto(position, np.where(position < self.origin, self.far, np.where(position > self.far, self.origin, position)))
+        self.rockets[envs] = rockets
+
+    def collide_rockets(self, envs: Union[slice, np.ndarray]) -> None:
+        rockets = self.rockets[envs]
+        centers = self.centers[envs]
+        offset_x = rockets[..., X, np.newaxis] - np.ascontiguousarray(centers[..., 0])[:, np.newaxis]
+        offset_y = rockets[..., Y, np.newaxis] - np.ascontiguousarray(centers[..., 1])[:, np.newaxis]
+        touching = offset_x * offset_x + offset_y * offset_y <= self.reach_squared
+        rows, players, bodies = np.nonzero(touching)
+        if not len(rows):
+            return
+        pairs, first = np.unique(rows * PLAYERS + players, return_index=True)
+        rows, players = np.divmod(pairs, PLAYERS)
+        bodies = bodies[first]
+        offset = np.stack((offset_x[rows, players, bodies], offset_y[rows, players, bodies]), axis=1)
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        apart = distance > 0
+        rows, players, bodies, offset, distance = rows[apart], players[apart], bodies[apart], offset[apart], distance[apart]
+        normal = offset / distance[:, np.newaxis]
+        reach = ROCKET_RADIUS + self.radii[bodies]
+        inside = distance < reach
+        position = rockets[rows, players, X:Y + 1]
+        position[inside] = centers[rows, bodies][inside] + normal[inside] * reach[inside, np.newaxis]
+        velocity = rockets[rows, players, VX:VY + 1]
+        impulse = np.einsum('ij,ij->i', velocity + self.orbit_velocities[envs][rows, bodies], normal)
+        rockets[rows, players, MANA] = np.minimum(FULL_MANA, rockets[rows, players, MANA] + np.abs(impulse * MANA_GAIN))
+        velocity -= normal * (2 * np.minimum(impulse, 0.0))[:, np.newaxis]
+        rockets[rows, players, X:Y + 1] = position
+        rockets[rows, players, VX:VY + 1] = velocity
+        self.rockets[envs] = rockets
+
+    def gravity(self, envs: np.ndarray, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        delta_x = self.centers[envs, :, 0] - positions[:, 0:1]
+        delta_y = self.centers[envs, :, 1] - positions[:, 1:2]
+        distance_sq = np.maximum(delta_x * delta_x + delta_y * delta_y, MIN_GRAVITY_DISTANCE_SQ)
+        strength = GRAVITY_FACTOR * self.masses / (distance_sq * np.sqrt(distance_sq))
+        acceleration = np.stack(((delta_x * strength).sum(axis=1), (delta_y * strength).sum(axis=1)), axis=1)
+        return acceleration, distance_sq
+
+    def update_missiles(self, running: np.ndarray) -> None:
+        envs, slots = np.nonzero(self.missile_alive & running[:, np.newaxis])
+        if not len(envs):
+            return
+        fresh = self.missile_age[envs, slots] == 0
+        if fresh.any():
+            self.missile_acceleration[envs[fresh], slots[fresh]] = self.gravity(envs[fresh], self.missile_position[envs[fresh], slots[fresh]])[0]
+        position = self.missile_position[envs, slots]
+        velocity = self.missile_velocity[envs, slots]
+        velocity += 0.5 * self.missile_acceleration[envs, slots]
+        position += velocity
+        position -= self.origin
+        np.mod(position, self.size, out=position)
+        position += self.origin
+        acceleration, distance_sq = self.gravity(envs, position)
+        velocity += 0.5 * acceleration
+        self.missile_position[envs, slots] = position
+        self.missile_velocity[envs, slots] = velocity
+        self.missile_acceleration[envs, slots] = acceleration
+        self.missile_age[envs, slots] += 1
+        expired = self.missile_age[envs, slots] > MISSILE_LIFETIME_TICKS
+        targets = 1 - self.missile_owner[envs, slots]
+        target_offset = position - self.rockets[envs, targets, X:Y + 1]
+        struck = ~expired & (np.einsum('ij,ij->i', target_offset, target_offset) <= (MISSILE_RADIUS + ROCKET_RADIUS) ** 2)
+        if struck.any():
+            np.add.at(self.rockets[..., HP], (envs[struck], targets[struck]), -MISSILE_DAMAGE)
+            np.maximum(self.rockets[..., HP], 0, out=self.rockets[..., HP])
+        crashed = (distance_sq <= (MISSILE_RADIUS + self.radii) ** 2).any(axis=1)
+        gone = struck | crashed | expired
+        self.missile_alive[envs[gone], slots[gone]] = False
+
+    def observe(self) -> np.ndarray:
+        return observe(self.rockets, self.centers, self.orbit_velocities, self.radii)
@@ -1,16 +1,142 @@
-from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, TICK_RATE
+from stupid_space_game.constants import RENDER_SCALE_LEVELS, RENDER_SCALE_WINDOW, RENDER_SCALE_DOWN_LOAD, RENDER_SCALE_UP_LOAD
+from stupid_space_game.constants import ORBIT_RING_COLOR, ORBIT_RING_WIDTH
+from stupid_space_game.constants import CORONA_CYCLE_TICKS, CORONA_BASE_RADIUS, CORONA_RADIUS_VARIATION, CORONA_LAYERS
+from stupid_space_game.constants import CORONA_OUTER_COLOR, CORONA_INNER_COLOR, CORONA_BLOB_COLORS, CORONA_BLOBS, CORONA_BLOB_LENGTH
+from stupid_space_game.constants import CORONA_BLOB_WIDTH, CORONA_BLOB_HEIGHT_FACTOR, CORONA_BLOB_LIVES_PER_CYCLE
+from stupid_space_game.constants import CORONA_BLOB_SPAWN_OFFSET, CORONA_BLOB_GRADIENT_LAYERS, CORONA_EXTENT, CORONA_SEED
 import pygame
 import os
-from typing import List, Tuple, Optional
+import random
+from collections import deque
+from itertools import chain, repeat
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Optional
 import math
+import numpy as np
+import stupid_space_game.trace as trace
+from stupid_space_game.profiler import FrameProfiler
 def init_graphics() -> pygame.Surface:
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREEN | pygame.NOFRAME)
     pygame.display.set_caption("Stupid Space Game")
     return screen
 
+
+class View(NamedTuple):
+    scale: float = 1.0
+    oscillate_background: bool = True
+    animate: bool = True
+    orbit_rings: bool = True
+    corona_frames: int = 48
+    corona_resolution: float = 1.0
+    tick: int = 0
+    camera_x: float = 0.0
+    camera_y: float = 0.0
+
+    def project(self, x: float, y: float) -> Tuple[float, float]:
+        return (x - self.camera_x) * self.scale, (y - self.camera_y) * self.scale
+
+
+ANIMATION_TICKS_PER_FRAME = 10
+
+
+def animation_frame(view: View, phase: int, frame_count: int) -> int:
+    ticks = view.tick if view.animate else 0
+    return (ticks // ANIMATION_TICKS_PER_FRAME + phase) % frame_count
+
+
+FULL_VIEW = View()
+
+LAYER_ORBITS = 0
+LAYER_CORONA = 1
+LAYER_BODIES = 2
+LAYER_PARTICLES = 3
+LAYER_MISSILES = 4
+LAYER_ROCKETS = 5
+RENDER_LAYERS = 6
+LAYER_NAMES = ('orbits', 'corona', 'bodies', 'particles', 'missiles', 'rockets')
+
+BlitItem = Tuple[pygame.Surface, Tuple[float, float], Optional[pygame.Rect], int]
+
+
+class RenderQueue:
+    def __init__(self, tracer: trace.Tracer = trace.NULL_TRACE) -> None:
+        self.tracer = tracer
+        self.layers: List[List[BlitItem]] = [[] for _ in range(RENDER_LAYERS)]
+        self.submitted = 0
+        self.culled = 0
+        self.pending_culled = 0
+
+    def push(self, layer: int, surface: pygame.Surface, dest: Tuple[float, float], special_flags: int = 0) -> None:
+        self.layers[layer].append((surface, dest, None, special_flags))
+
+    def extend(self, layer: int, items: Iterable[BlitItem]) -> None:
+        self.layers[layer].extend(items)
+
+    def cull(self, count: int = 1) -> None:
+        self.pending_culled += count
+
+    def flush(self, screen: pygame.Surface, profiler: Optional[FrameProfiler] = None) -> None:
+        with self.tracer.span("graphics.flush"):
+            self.submitted = sum(len(layer) for layer in self.layers)
+            self.culled, self.pending_culled = self.pending_culled, 0
+            if profiler is None:
+                screen.blits(chain.from_iterable(self.layers), doreturn=False)
+            else:
+                for name, layer in zip(LAYER_NAMES, self.layers):
+                    screen.blits(layer, doreturn=False)
+                    profiler.mark(f"world.draw.{name}")
+            for layer in self.layers:
+                layer.clear()
+
+
+def scale_surface(surface: pygame.Surface, scale: float) -> pygame.Surface:
+    width, height = surface.get_size()
+    return pygame.transform.scale(surface, (max(1, round(width * scale)), max(1, round(height * scale))))
+
+
+class RenderTarget:
+    def __init__(self, display: pygame.Surface, scale: float = 1.0, tracer: trace.Tracer = trace.NULL_TRACE) -> None:
+        self.display = display
+        self.tracer = tracer
+        self.frame_times: Deque[float] = deque(maxlen=RENDER_SCALE_WINDOW)
+        self.view = FULL_VIEW
+        self.set_scale(scale)
+
+    def set_scale(self, scale: float) -> None:
+        self.scale = scale
+        self.view = self.view._replace(scale=scale)
+        if scale == 1.0:
+            self.surface = self.display
+        else:
+            size = (round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale))
+            self.surface = pygame.Surface(size).convert(self.display)
+        self.frame_times.clear()
+        print(f"Render scale set to {scale:.2f}")
+
+    def present(self) -> None:
+        if self.surface is not self.display:
+            with self.tracer.span("graphics.present"):
+                pygame.transform.scale(self.surface, self.display.get_size(), self.display)
+
+    def adapt(self, frame_ms: float) -> None:
+        self.frame_times.append(frame_ms)
+        if len(self.frame_times) < RENDER_SCALE_WINDOW:
+            return
+        load = sum(self.frame_times) / len(self.frame_times) * TICK_RATE / 1000.0
+        lower = [level for level in RENDER_SCALE_LEVELS if level < self.scale]
+        higher = [level for level in RENDER_SCALE_LEVELS if level > self.scale]
+        if load > RENDER_SCALE_DOWN_LOAD and lower:
+            self.set_scale(max(lower))
+        elif load < RENDER_SCALE_UP_LOAD and higher:
+            self.set_scale(min(higher))
+        else:
+            self.frame_times.clear()
+
+
 class CelestialBodyGraphics:
-    def __init__(self, sprite_id: str, radius: int = 50) -> None:
+    def __init__(self, sprite_id: str, radius: int = 50, phase: int = 0, tracer: trace.Tracer = trace.NULL_TRACE) -> None:
+        self.tracer = tracer
         sprite_path = os.path.join('./assets/planets', f"{sprite_id}.png")
         self.spritesheet = pygame.image.load(sprite_path).convert_alpha()
         self.frames: List[pygame.Surface] = []
@@ -21,21 +147,178 @@ class CelestialBodyGraphics:
             if radius != 50:
                 frame = pygame.transform.scale(frame, (frame_size, frame_size))
             self.frames.append(frame)
-        self.current_frame: int = 0
-        self.animation_speed: float = 0.1
-        self.animation_timer: float = 0
+        self.phase = phase
         self.radius = radius
+        self.scaled_frames: Dict[float, List[pygame.Surface]] = {1.0: self.frames}
+
+    def frames_at(self, scale: float) -> List[pygame.Surface]:
+        frames = self.scaled_frames.get(scale)
+        if frames is None:
+            frames = self.scaled_frames[scale] = [scale_surface(frame, scale) for frame in self.frames]
+        return frames
+
+    def sprite(self, position: pygame.math.Vector2, view: View = FULL_VIEW) -> Tuple[pygame.Surface, Tuple[float, float]]:
+        frames = self.frames_at(view.scale)
+        frame = frames[animation_frame(view, self.phase, len(frames))]
+        radius = self.radius * view.scale
+        x, y = view.project(position.x, position.y)
+        return frame, (x - radius, y - radius)
+
+    def draw(self, screen: pygame.Surface, position: pygame.math.Vector2, view: View = FULL_VIEW) -> None:
+        with self.tracer.span("graphics.celestial"):
+            screen.blit(*self.sprite(position, view))
+
+
+class CoronaBlob(NamedTuple):
+    phase_offset: float
+    angles: List[float]
+    lengths: List[float]
+    widths: List[float]
+    height_factors: List[float]
+    colors: List[Tuple[int, int, int]]
+
+
+def lerp_color(color1: Tuple[int, int, int], color2: Tuple[int, int, int], factor: float) -> Tuple[int, int, int]:
+    return tuple(int(c1 + factor * (c2 - c1)) for c1, c2 in zip(color1, color2))
+
+
+def corona_blobs(seed: int = CORONA_SEED) -> List[CoronaBlob]:
+    rng = random.Random(seed)
+    blobs = []
+    for _ in range(CORONA_BLOBS):
+        lives = rng.randint(*CORONA_BLOB_LIVES_PER_CYCLE)
+        blobs.append(CoronaBlob(
+            phase_offset=rng.uniform(0, math.pi),
+            angles=[rng.uniform(0, 2 * math.pi) for _ in range(lives)],
+            lengths=[rng.uniform(*CORONA_BLOB_LENGTH) for _ in range(lives)],
+            widths=[rng.uniform(*CORONA_BLOB_WIDTH) for _ in range(lives)],
+            height_factors=[rng.uniform(*CORONA_BLOB_HEIGHT_FACTOR) for _ in range(lives)],
+            colors=[rng.choice(CORONA_BLOB_COLORS) for _ in range(lives)],
+        ))
+    return blobs
+
+
+def draw_corona_blob(surface: pygame.Surface, blob: CoronaBlob, cycle: float, core_radius: float, resolution: float) -> None:
+    lives = len(blob.angles)
+    life = int(cycle * lives)
+    progress = cycle * lives - life
+    stretch = max(0.0, math.sin(progress * math.pi + blob.phase_offset))
+    fade = math.sin(progress * math.pi)
+    base_alpha = max(0, min(255, int(220 * fade)))
+    width = blob.widths[life] * (1 + stretch * 0.2)
+    height = blob.widths[life] * blob.height_factors[life] * stretch
+    if progress <= 0.01 or width <= 1 or height <= 1 or base_alpha <= 10:
+        return
+    distance = core_radius + CORONA_BLOB_SPAWN_OFFSET + blob.lengths[life] * stretch
+    center = surface.get_width() / 2
+    center_x = center + math.cos(blob.angles[life]) * distance * resolution
+    center_y = center + math.sin(blob.angles[life]) * distance * resolution
+    size_scale = 1.0 + (CORONA_BLOB_GRADIENT_LAYERS - 1) * 0.4
+    alpha_scale = 0.4
+    for _ in range(CORONA_BLOB_GRADIENT_LAYERS):
+        layer_width = width * size_scale * resolution
+        layer_height = height * size_scale * resolution
+        alpha = max(0, min(255, int(base_alpha * alpha_scale)))
+        if layer_width >= 1 and layer_height >= 1 and alpha > 5:
+            pygame.draw.ellipse(
+                surface,
+                blob.colors[life] + (alpha,),
+                pygame.Rect(center_x - layer_width / 2, center_y - layer_height / 2, layer_width, layer_height),
+            )
+        size_scale -= 0.4
+        alpha_scale += 0.3
+
+
+def bake_corona(frame_count: int, resolution: float = 1.0, seed: int = CORONA_SEED) -> List[pygame.Surface]:
+    blobs = corona_blobs(seed)
+    size = math.ceil(2 * CORONA_EXTENT * resolution)
+    frames = []
+    for index in range(frame_count):
+        cycle = index / frame_count
+        angle = 2 * math.pi * cycle
+        frame = pygame.Surface((size, size), pygame.SRCALPHA)
+        core_radius = CORONA_BASE_RADIUS + math.sin(angle) * CORONA_RADIUS_VARIATION
+        outer_radius = CORONA_BASE_RADIUS * 1.8
+        inner_radius = CORONA_BASE_RADIUS * 0.4
+        for layer in range(CORONA_LAYERS):
+            depth = layer / (CORONA_LAYERS - 1)
+            wobble = math.sin(angle + layer * 0.7)
+            radius = outer_radius - depth * (outer_radius - inner_radius)
+            radius += wobble * CORONA_RADIUS_VARIATION * (1.1 - 0.8 * depth)
+            alpha = 80 + depth * 140 + wobble * 60 * (1.0 - 0.6 * depth)
+            color = lerp_color(CORONA_OUTER_COLOR, CORONA_INNER_COLOR, depth) + (max(0, min(255, int(alpha))),)
+            pygame.draw.circle(frame, color, (size / 2, size / 2), max(1, radius * resolution))
+        for blob in blobs:
+            draw_corona_blob(frame, blob, cycle, core_radius, resolution)
+        frames.append(frame.convert_alpha())
+    return frames
+
+
+class CoronaGraphics:
+    def __init__(self, radius: int, tracer: trace.Tracer = trace.NULL_TRACE) -> None:
+        self.tracer = tracer
+        self.pixel_size = 2 * radius / 100
+        self.radius = CORONA_EXTENT * self.pixel_size
+        self.baked: Dict[Tuple[int, float], List[pygame.Surface]] = {}
+        self.scratch: Dict[float, pygame.Surface] = {}
+        self.scratch_frames: Dict[float, Tuple[int, float, int]] = {}
+
+    def frames(self, frame_count: int, resolution: float) -> List[pygame.Surface]:
+        frames = self.baked.get((frame_count, resolution))
+        if frames is None:
+            with self.tracer.span("graphics.corona.bake"):
+                frames = self.baked[(frame_count, resolution)] = bake_corona(frame_count, resolution)
+        return frames
+
+    def sprite(self, position: pygame.math.Vector2, view: View = FULL_VIEW) -> Tuple[pygame.Surface, Tuple[float, float]]:
+        frames = self.frames(view.corona_frames, view.corona_resolution)
+        ticks = view.tick % CORONA_CYCLE_TICKS if view.animate else 0
+        index = ticks * len(frames) // CORONA_CYCLE_TICKS
+        size = round(2 * CORONA_EXTENT * self.pixel_size * view.scale)
+        scratch = self.scratch.get(view.scale)
+        if scratch is None:
+            scratch = self.scratch[view.scale] = pygame.Surface((size, size), pygame.SRCALPHA).convert_alpha()
+        shown = (view.corona_frames, view.corona_resolution, index)
+        if self.scratch_frames.get(view.scale) != shown:
+            with self.tracer.span("graphics.corona"):
+                pygame.transform.scale(frames[index], (size, size), scratch)
+            self.scratch_frames[view.scale] = shown
+        x, y = view.project(position.x, position.y)
+        return scratch, (x - size / 2, y - size / 2)
+
+
+class OrbitRingLayer:
+    def __init__(self, tracer: trace.Tracer = trace.NULL_TRACE) -> None:
+        self.tracer = tracer
+        self.surfaces: Dict[Tuple[int, int], pygame.Surface] = {}
+        self.dirty: Dict[Tuple[int, int], pygame.Rect] = {}
+
+    def sprite(
+        self,
+        size: Tuple[int, int],
+        centers: np.ndarray,
+        radii: np.ndarray,
+        view: View = FULL_VIEW,
+    ) -> BlitItem:
+        surface = self.surfaces.get(size)
+        if surface is None:
+            surface = self.surfaces[size] = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            self.dirty[size] = surface.get_rect()
+        with self.tracer.span("graphics.orbit_rings"):
+            surface.fill((0, 0, 0, 0), self.dirty[size])
+            width = max(1, round(ORBIT_RING_WIDTH * view.scale))
+            drawn = [
+                pygame.draw.circle(surface, ORBIT_RING_COLOR, view.project(x, y), radius * view.scale, width)
+                for (x, y), radius in zip(centers.tolist(), radii.tolist())
+            ]
+            area = drawn[0].unionall(drawn[1:]).clip(surface.get_rect())
+            self.dirty[size] = area
+        return surface, area.topleft, area, 0
 
-    def draw(self, screen: pygame.Surface, position: pygame.math.Vector2) -> None:
-        self.animation_timer += self.animation_speed
-        if self.animation_timer >= 1:
-            self.animation_timer = 0
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-        frame = self.frames[self.current_frame]
-        screen.blit(frame, (position.x - self.radius, position.y - self.radius))
 
 class RocketGraphics:
-    def __init__(self) -> None:
+    def __init__(self, tracer: trace.Tracer = trace.NULL_TRACE) -> None:
+        self.tracer = tracer
         self.rocket_on = pygame.image.load('./assets/rocket_on.png').convert_alpha()
         self.rocket_off = pygame.image.load('./assets/rocket_off.png').convert_alpha()
         
@@ -44,45 +327,125 @@ class RocketGraphics:
         for angle in range(0, 360, 2):
             self.frames_on.append(pygame.transform.rotate(self.rocket_on, -angle))
             self.frames_off.append(pygame.transform.rotate(self.rocket_off, -angle))
-    
-    
+        self.scaled_frames: Dict[float, Tuple[List[pygame.Surface], List[pygame.Surface]]] = {
+            1.0: (self.frames_on, self.frames_off)
+        }
+
+    def frames_at(self, scale: float) -> Tuple[List[pygame.Surface], List[pygame.Surface]]:
+        frames = self.scaled_frames.get(scale)
+        if frames is None:
+            frames = self.scaled_frames[scale] = (
+                [scale_surface(frame, scale) for frame in self.frames_on],
+                [scale_surface(frame, scale) for frame in self.frames_off],
+            )
+        return frames
+
+    def sprite(
+        self,
+        position: pygame.math.Vector2,
+        rotation: float = 0,
+        thrusters_on: bool = False,
+        view: View = FULL_VIEW,
+    ) -> Tuple[pygame.Surface, pygame.Rect]:
+        frame_index = int(round(rotation % 360 / 2))
+        frames_on, frames_off = self.frames_at(view.scale)
+        sprite = frames_on[frame_index] if thrusters_on else frames_off[frame_index]
+        return sprite, sprite.get_rect(center=view.project(position.x, position.y))
+
     def draw(
         self,
         screen: pygame.Surface,
         position: pygame.math.Vector2,
         rotation: float = 0,
-        thrusters_on: bool = False
+        thrusters_on: bool = False,
+        view: View = FULL_VIEW,
     ) -> None:
-        frame_index = int(round(rotation % 360 / 2))
-        sprite = self.frames_on[frame_index] if thrusters_on else self.frames_off[frame_index]
-        sprite_rect = sprite.get_rect(center=(position.x, position.y))
-        screen.blit(sprite, sprite_rect)
+        with self.tracer.span("graphics.rocket"):
+            screen.blit(*self.sprite(position, rotation, thrusters_on, view))
 
 class MissileGraphics:
     def __init__(self) -> None:
         self.missile = pygame.image.load('./assets/missile.png').convert_alpha()
-    
-    def draw(self, screen: pygame.Surface, position: Tuple[int, int], rotation: float = 0) -> None:
-        sprite = self.missile
-        if rotation != 0:
-            sprite = pygame.transform.rotate(sprite, rotation)
-        sprite_rect = sprite.get_rect(center=position)
-        screen.blit(sprite, sprite_rect)
+        self.frames = [pygame.transform.rotate(self.missile, -angle) for angle in range(0, 360, 2)]
+        self.scaled_frames: Dict[float, List[pygame.Surface]] = {1.0: self.frames}
+
+    def frames_at(self, scale: float) -> List[pygame.Surface]:
+        frames = self.scaled_frames.get(scale)
+        if frames is None:
+            frames = self.scaled_frames[scale] = [scale_surface(frame, scale) for frame in self.frames]
+        return frames
 
+    def sprite(self, position: Tuple[float, float], rotation: float = 0, view: View = FULL_VIEW) -> Tuple[pygame.Surface, pygame.Rect]:
+        frames = self.frames_at(view.scale)
+        sprite = frames[int(round(rotation % 360 / 2)) % len(frames)]
+        return sprite, sprite.get_rect(center=view.project(position[0], position[1]))
+
+
+
+PARTICLE_FADE_STEPS = 8
+
+
+class ParticleGraphics:
+    def __init__(self, sprites: List[Tuple[int, Tuple[int, int, int]]]) -> None:
+        explosion = pygame.image.load('./assets/explosion.png').convert_alpha()
+        self.frames: List[pygame.Surface] = []
+        for size, tint in sprites:
+            glow = pygame.transform.smoothscale(explosion, (size, size))
+            glow.fill((*tint, 255), special_flags=pygame.BLEND_RGBA_MULT)
+            for step in range(PARTICLE_FADE_STEPS):
+                frame = pygame.Surface((size, size)).convert()
+                frame.blit(glow, (0, 0))
+                brightness = 255 * (PARTICLE_FADE_STEPS - step) // PARTICLE_FADE_STEPS
+                frame.fill((brightness, brightness, brightness), special_flags=pygame.BLEND_MULT)
+                self.frames.append(frame)
+        self.scaled_frames: Dict[float, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def frames_at(self, scale: float) -> Tuple[np.ndarray, np.ndarray]:
+        frames = self.scaled_frames.get(scale)
+        if frames is None:
+            surfaces = np.empty(len(self.frames), dtype=object)
+            surfaces[:] = [frame if scale == 1.0 else scale_surface(frame, scale) for frame in self.frames]
+            half_sizes = np.array([surface.get_size() for surface in surfaces], dtype=np.float32) / 2
+            frames = self.scaled_frames[scale] = (surfaces, half_sizes)
+        return frames
+
+    def sprites(
+        self,
+        positions: np.ndarray,
+        kinds: np.ndarray,
+        ages: np.ndarray,
+        lifetimes: np.ndarray,
+        view: View = FULL_VIEW,
+    ) -> Iterator[BlitItem]:
+        surfaces, half_sizes = self.frames_at(view.scale)
+        frame = kinds.astype(np.intp) * PARTICLE_FADE_STEPS + ages * PARTICLE_FADE_STEPS // lifetimes
+        destinations = (positions - (view.camera_x, view.camera_y)) * view.scale - half_sizes[frame]
+        return zip(surfaces[frame].tolist(), destinations.tolist(), repeat(None), repeat(pygame.BLEND_ADD))
 
 
 class BackgroundGraphics:
-    def __init__(self) -> None:
+    def __init__(self, tracer: trace.Tracer = trace.NULL_TRACE) -> None:
+        self.tracer = tracer
         background = pygame.image.load('./assets/background.png').convert()
         self.oscillation_amplitude = 500
         self.background = pygame.transform.scale(background, (1000 + SCREEN_WIDTH,1000 + SCREEN_HEIGHT))
         self.oscillation_angle = 0.01
+        self.scaled_backgrounds: Dict[float, pygame.Surface] = {1.0: self.background}
+
+    def background_at(self, scale: float) -> pygame.Surface:
+        background = self.scaled_backgrounds.get(scale)
+        if background is None:
+            background = self.scaled_backgrounds[scale] = scale_surface(self.background, scale)
+        return background
+
+    def update(self, view: View = FULL_VIEW) -> None:
+        if view.oscillate_background:
+            self.oscillation_angle += 0.003
 
-    
-    def draw(self, screen: pygame.Surface) -> None:
-        self.oscillation_angle += 0.003
-        x = int(self.oscillation_amplitude*math.sin(self.oscillation_angle))
-        y = int(self.oscillation_amplitude*math.cos(self.oscillation_angle))
-        screen.blit(self.background, (-500 + x, -500 + y))
+    def draw(self, screen: pygame.Surface, view: View = FULL_VIEW) -> None:
+        with self.tracer.span("graphics.background"):
+            x = int(self.oscillation_amplitude*math.sin(self.oscillation_angle))
+            y = int(self.oscillation_amplitude*math.cos(self.oscillation_angle))
+            screen.blit(self.background_at(view.scale), ((-500 + x) * view.scale, (-500 + y) * view.scale))
 
 
@@ -0,0 +1,90 @@
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Sequence, Tuple
+import pygame
+from stupid_space_game.constants import KEY_BINDINGS, INPUT_LATENCY_WINDOW
+
+UP = 0
+DOWN = 1
+LEFT = 2
+RIGHT = 3
+FIRE = 4
+ACTIONS = 5
+ACTION_NAMES = ('up', 'down', 'left', 'right', 'fire')
+
+
+class Binding(NamedTuple):
+    key: int
+    player: int
+    action: int
+
+
+class Edge(NamedTuple):
+    player: int
+    action: int
+    pressed: bool
+    timestamp: float
+
+
+class InputState:
+    def __init__(self, bindings: Sequence[Tuple[int, int, str]] = KEY_BINDINGS, players: int = 2) -> None:
+        self.bindings: Dict[int, Binding] = {
+            key: Binding(key, player, ACTION_NAMES.index(action)) for key, player, action in bindings
+        }
+        self.held: List[List[bool]] = [[False] * ACTIONS for _ in range(players)]
+        self.tapped: List[List[bool]] = [[False] * ACTIONS for _ in range(players)]
+        self.edges: Deque[Edge] = deque()
+        self.pending: List[pygame.event.Event] = []
+        self.latencies: Deque[float] = deque(maxlen=INPUT_LATENCY_WINDOW)
+
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        if event.type != pygame.KEYDOWN and event.type != pygame.KEYUP:
+            return False
+        binding = self.bindings.get(event.key)
+        if binding is None:
+            return False
+        pressed = event.type == pygame.KEYDOWN
+        self.held[binding.player][binding.action] = pressed
+        if pressed:
+            self.tapped[binding.player][binding.action] = True
+        self.edges.append(Edge(binding.player, binding.action, pressed, time.perf_counter()))
+        return True
+
+    def poll(self) -> List[pygame.event.Event]:
+        events = self.pending
+        self.pending = []
+        for event in pygame.event.get():
+            self.handle_event(event)
+            events.append(event)
+        return events
+
+    def wait(self, deadline: float) -> None:
+        while True:
+            remaining_ms = int((deadline - time.perf_counter()) * 1000.0)
+            if remaining_ms <= 0:
+                return
+            event = pygame.event.wait(remaining_ms)
+            if event.type == pygame.NOEVENT:
+                return
+            self.handle_event(event)
+            self.pending.append(event)
+
+    def active(self, player: int, action: int) -> bool:
+        return self.held[player][action] or self.tapped[player][action]
+
+    def consume(self) -> List[Edge]:
+        now = time.perf_counter()
+        edges = list(self.edges)
+        for edge in edges:
+            self.latencies.append((now - edge.timestamp) * 1000.0)
+        self.edges.clear()
+        return edges
+
+    def end_tick(self) -> None:
+        for tapped in self.tapped:
+            tapped[:] = [False] * ACTIONS
+
+    def latency_ms(self) -> float:
+        if not self.latencies:
+            return 0.0
+        return max(self.latencies)
@@ -0,0 +1,75 @@
+import json
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Sequence
+from stupid_space_game.constants import LATENCY_BUCKET_MS, LATENCY_BUCKETS
+from stupid_space_game.inputs import Edge
+
+HISTOGRAM_BAR_WIDTH = 50
+
+
+class InFlight(NamedTuple):
+    tick: int
+    timestamp: float
+
+
+class PhotonLatency:
+    def __init__(self, bucket_ms: float = LATENCY_BUCKET_MS, buckets: int = LATENCY_BUCKETS) -> None:
+        self.bucket_ms = bucket_ms
+        self.counts: List[int] = [0] * (buckets + 1)
+        self.in_flight: Deque[InFlight] = deque()
+        self.total = 0
+        self.worst_ms = 0.0
+
+    def submit(self, tick: int, edges: Sequence[Edge]) -> None:
+        for edge in edges:
+            if edge.pressed:
+                self.in_flight.append(InFlight(tick, edge.timestamp))
+
+    def presented(self, tick: int) -> None:
+        now = time.perf_counter()
+        while self.in_flight and self.in_flight[0].tick <= tick:
+            self.record((now - self.in_flight.popleft().timestamp) * 1000.0)
+
+    def record(self, latency_ms: float) -> None:
+        self.counts[min(len(self.counts) - 1, int(latency_ms / self.bucket_ms))] += 1
+        self.total += 1
+        self.worst_ms = max(self.worst_ms, latency_ms)
+
+    def percentile(self, q: float) -> float:
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen > q * self.total:
+                return (bucket + 1) * self.bucket_ms
+        return 0.0
+
+    def report(self) -> str:
+        if self.total == 0:
+            return "Input-to-photon latency: no key presses recorded"
+        lines = [
+            f"Input-to-photon latency over {self.total} key presses: "
+            f"p50 <{self.percentile(0.5):.0f} ms  p95 <{self.percentile(0.95):.0f} ms  worst {self.worst_ms:.1f} ms"
+        ]
+        peak = max(self.counts)
+        first = next(bucket for bucket, count in enumerate(self.counts) if count)
+        last = max(bucket for bucket, count in enumerate(self.counts) if count)
+        for bucket in range(first, last + 1):
+            low = bucket * self.bucket_ms
+            label = f"{low:4.0f}+    ms" if bucket == len(self.counts) - 1 else f"{low:4.0f}-{low + self.bucket_ms:<4.0f}ms"
+            bar = '#' * round(self.counts[bucket] / peak * HISTOGRAM_BAR_WIDTH)
+            lines.append(f"{label} {self.counts[bucket]:6d} {bar}")
+        return "\n".join(lines)
+
+    def export(self, path: str) -> None:
+        histogram = {
+            "bucket_ms": self.bucket_ms,
+            "counts": self.counts,
+            "total": self.total,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "worst_ms": self.worst_ms,
+        }
+        with open(path, "w") as histogram_file:
+            json.dump(histogram, histogram_file, indent=1)
+        print(f"Latency histogram written to {path}")
@@ -1,54 +1,243 @@
 import sys
+import time
+import argparse
+from typing import List, Optional
 import pygame
-from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TICK_RATE, PROFILER_EXPORT_KEY, PROFILER_EXPORT_PATH
+from stupid_space_game.constants import TRACE_FLUSH_KEY, TRACE_OUTPUT_PATH, RENDER_SCALE, RENDER_SCALE_LEVELS, LATENCY_OUTPUT_PATH
+from stupid_space_game.constants import MINIGAME_PAUSES_WORLD, MINIGAME_TICK_RATE, NETPLAY_PORT, BOT_LEVEL
+from stupid_space_game.constants import PANE_DIVIDER_COLOR, PANE_DIVIDER_WIDTH
 import stupid_space_game.graphics as graphics
-from stupid_space_game.world import World
-from stupid_space_game.controls import player1_input_control,  player2_input_control, player_shoot_check
+from stupid_space_game.world import World, large_world_bounds
+from stupid_space_game.camera import Pane, shared_pane, split_panes
+from stupid_space_game.bot import Bot, BOT_LEVELS, bot_level
+from stupid_space_game.controls import action_mask, mask_input_control, player_shoot_check, player_fire_control
+from stupid_space_game.inputs import InputState
+from stupid_space_game.latency import PhotonLatency
+from stupid_space_game.netplay import RollbackSession, UdpLink
+from stupid_space_game.profiler import FrameProfiler
+from stupid_space_game.quality import QualityGovernor
 import stupid_space_game.ui as ui
-import stupid_space_game.missile_logic as missile_logic
+from stupid_space_game.missile_logic import MissileMinigame
+import stupid_space_game.trace as trace
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Triangles in Space!")
+    parser.add_argument('--profile', action='store_true', help="show the frame profiler overlay")
+    parser.add_argument('--profile-export', default=PROFILER_EXPORT_PATH, help="path of the profiler JSON capture")
+    parser.add_argument('--render-scale', default=str(RENDER_SCALE), help="world render resolution as a fraction of the screen, or 'adaptive'")
+    parser.add_argument('--adaptive-quality', action='store_true', help="shed expensive rendering features when frames run over budget")
+    parser.add_argument('--large-world', action='store_true', help="play in a wrap-around world several screens wide with a following camera")
+    parser.add_argument('--split-screen', action='store_true', help="give each player a half-screen view with its own camera")
+    parser.add_argument('--trace', nargs='?', const=TRACE_OUTPUT_PATH, default=None, help="record frame spans to a Trace Event Format JSON file")
+    parser.add_argument('--latency', nargs='?', const=LATENCY_OUTPUT_PATH, default=None, help="record an input-to-photon latency histogram to a JSON file")
+    parser.add_argument('--netplay', type=int, choices=(1, 2), default=None, help="play one side of a UDP match as player 1 or 2, using the player 1 keys")
+    parser.add_argument('--peer', default='127.0.0.1', help="host of the other netplay peer")
+    parser.add_argument('--net-latency', type=float, default=0.0, help="extra one-way latency in ms added to outgoing netplay packets")
+    parser.add_argument('--bot', nargs='?', const=BOT_LEVEL, default=None, choices=[level.name for level in BOT_LEVELS], help="let a scripted opponent fly player 2 at the given difficulty")
+    parser.add_argument('--net-loss', type=float, default=0.0, help="fraction of outgoing netplay packets dropped on purpose")
+    return parser.parse_args()
+
+
+def quit_game(
+    args: argparse.Namespace,
+    profiler: Optional[FrameProfiler],
+    latency: Optional[PhotonLatency],
+    session: Optional[RollbackSession],
+    tracer: trace.Tracer,
+):
+    if session is not None:
+        print(session.report())
+        session.link.close()
+    if profiler is not None:
+        profiler.export(args.profile_export)
+    if latency is not None:
+        print(latency.report())
+        latency.export(args.latency)
+    tracer.flush(args.trace)
+    pygame.quit()
+    sys.exit()
+
+
+def draw_panes(
+    render_target: graphics.RenderTarget,
+    background: graphics.BackgroundGraphics,
+    world: World,
+    panes: List[Pane],
+    profiler: Optional[FrameProfiler],
+    snap: bool = False,
+) -> None:
+    width, height = render_target.surface.get_size()
+    scale_x, scale_y = width / SCREEN_WIDTH, height / SCREEN_HEIGHT
+    for pane in panes:
+        targets = world.rockets if pane.rocket is None else [world.rockets[pane.rocket]]
+        pane.camera.frame([rocket.position for rocket in targets], snap)
+        left, right = round(pane.rect.left * scale_x), round(pane.rect.right * scale_x)
+        top, bottom = round(pane.rect.top * scale_y), round(pane.rect.bottom * scale_y)
+        surface = render_target.surface.subsurface(pygame.Rect(left, top, right - left, bottom - top))
+        background.draw(surface, render_target.view)
+        if profiler is not None:
+            profiler.mark("background.draw")
+        world.draw(surface, pane.camera.apply(render_target.view), profiler)
+
+
+def draw_dividers(screen: pygame.Surface, panes: List[Pane]) -> None:
+    for pane in panes[1:]:
+        pygame.draw.line(screen, PANE_DIVIDER_COLOR, pane.rect.topleft, pane.rect.bottomleft, PANE_DIVIDER_WIDTH)
 
 
 def main():
+    args = parse_args()
+    tracer = trace.TraceBuffer() if args.trace is not None else trace.NULL_TRACE
     screen = graphics.init_graphics()
     ui.ui_init()
     ui.show_full_screen(screen, './assets/splash/title.png')
 
-    world = World()
-    background = graphics.BackgroundGraphics()
+    adaptive_scale = args.render_scale == 'adaptive'
+    render_target = graphics.RenderTarget(screen, max(RENDER_SCALE_LEVELS) if adaptive_scale else float(args.render_scale), tracer)
+    governor = QualityGovernor(render_target) if args.adaptive_quality else None
+    world = World(large_world_bounds() if args.large_world else None, tracer=tracer)
+    duel_pane = shared_pane(world.bounds)
+    camera = duel_pane.camera
+    play_panes = split_panes(world.bounds) if args.split_screen else [duel_pane]
+    background = graphics.BackgroundGraphics(tracer)
+    hud = ui.FighterHud(SCREEN_WIDTH, len(world.rockets))
+    minimap = ui.Minimap(world.bounds, world.static_orbits(), world.fixed_bodies()) if args.large_world else None
+    profiler = FrameProfiler() if args.profile else None
+    inputs = InputState(players=len(world.rockets))
+    latency = PhotonLatency() if args.latency is not None else None
+    session = None
+    if args.netplay is not None:
+        player = args.netplay - 1
+        link = UdpLink(('', NETPLAY_PORT + player), (args.peer, NETPLAY_PORT + 1 - player), args.net_latency, args.net_loss)
+        session = RollbackSession(world, player, link, tracer=tracer)
+    bot = Bot(1, bot_level(args.bot)) if args.bot is not None and session is None else None
+    minigame: Optional[MissileMinigame] = None
     clock = pygame.time.Clock()
+    dt = 0
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                pygame.quit()
-                sys.exit()
-        
-        keys = pygame.key.get_pressed()
-        player1_input_control(keys, world.rocket1)
-        player2_input_control(keys, world.rocket2)
-        world.update()
-        background.draw(screen)
-        world.draw(screen)
-        pygame.display.update()
-        if world.rocket1.hp <= 0 or  world.rocket2.hp <= 0:
-            if world.rocket1.hp <= 0 and world.rocket2.hp == 0:
-                ui.show_full_screen(screen, './assets/splash/tie.png')
-            elif world.rocket1.hp <= 0:
-                ui.show_full_screen(screen, './assets/splash/player2.png')
-            elif world.rocket2.hp <= 0:
-                ui.show_full_screen(screen, './assets/splash/player1.png')
-            pygame.quit()
-            sys.exit()
-        shoot = player_shoot_check(keys, world)
-        if shoot == 1:
-            damage = missile_logic.missile_minigame(screen, clock, world.rocket1.position, world.rocket2.position)
-            world.rocket2.hp = max(0, world.rocket2.hp - damage)
-            world.rocket1.mana = 0
-        elif shoot == 2:
-            damage = missile_logic.missile_minigame(screen, clock, world.rocket2.position, world.rocket1.position)
-            world.rocket1.hp = max(0, world.rocket1.hp - damage)
-            world.rocket2.mana = 0
-        clock.tick(30)
+        frame_start = time.perf_counter()
+        if profiler is not None:
+            profiler.begin_frame()
+        with tracer.span("frame"):
+            with tracer.span("input"):
+                for event in inputs.poll():
+                    if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                        quit_game(args, profiler, latency, session, tracer)
+                    if profiler is not None and event.type == pygame.KEYDOWN and event.key == PROFILER_EXPORT_KEY:
+                        profiler.export(args.profile_export)
+                    if event.type == pygame.KEYDOWN and event.key == TRACE_FLUSH_KEY:
+                        tracer.flush(args.trace)
+                    if minigame is not None:
+                        minigame.handle_event(event)
+
+                masks = [action_mask(inputs, player) for player in range(len(world.rockets))]
+                if bot is not None and (minigame is None or not MINIGAME_PAUSES_WORLD):
+                    masks[bot.player] = bot.decide(world)
+                    if profiler is not None:
+                        profiler.count("bot.decision_us", round(bot.decision_ms[-1] * 1000.0))
+                for mask, rocket in zip(masks, world.rockets):
+                    mask_input_control(mask, rocket)
+                edges = inputs.consume()
+            if profiler is not None:
+                profiler.mark("input")
+            world_running = minigame is None or not MINIGAME_PAUSES_WORLD
+            advanced = True
+            if world_running:
+                if session is not None:
+                    advanced = session.advance(masks[0])
+                else:
+                    world.update()
+                if latency is not None and advanced:
+                    latency.submit(world.ticks if session is None else session.local_frame + 1, edges)
+            if profiler is not None:
+                profiler.mark("world.update")
+            if world_running:
+                panes = play_panes if minigame is None else [duel_pane]
+                background.update(render_target.view)
+                draw_panes(render_target, background, world, panes, profiler)
+                render_target.present()
+                if profiler is not None:
+                    profiler.mark("present")
+                with tracer.span("hud.draw"):
+                    draw_dividers(screen, panes)
+                    hud.draw(screen, world.rockets)
+                    if minimap is not None:
+                        minimap.draw(screen, world.celestial_centers(), world.rockets, [pane.camera.viewport() for pane in panes])
+                if profiler is not None:
+                    profiler.mark("hud.draw")
+            if minigame is not None:
+                with tracer.span("missile.update"):
+                    minigame.update(dt)
+                dirty_rects = minigame.draw(screen)
+                if profiler is not None:
+                    profiler.mark("missile_minigame")
+            if profiler is not None and world_running:
+                profiler.draw(screen)
+                profiler.mark("profiler.draw")
+            with tracer.span("display.update"):
+                if world_running:
+                    pygame.display.update()
+                else:
+                    pygame.display.update(dirty_rects)
+            if latency is not None and world_running:
+                latency.presented(world.drawn_tick)
+            if profiler is not None:
+                profiler.mark("display.update")
+            confirmed = session is None or world.ticks - 1 <= session.remote_confirmed
+            if confirmed and (world.rocket1.hp <= 0 or  world.rocket2.hp <= 0):
+                if world.rocket1.hp <= 0 and world.rocket2.hp == 0:
+                    ui.show_full_screen(screen, './assets/splash/tie.png')
+                elif world.rocket1.hp <= 0:
+                    ui.show_full_screen(screen, './assets/splash/player2.png')
+                elif world.rocket2.hp <= 0:
+                    ui.show_full_screen(screen, './assets/splash/player1.png')
+                quit_game(args, profiler, latency, session, tracer)
+            if minigame is not None and minigame.finished:
+                target = world.rockets[minigame.target]
+                target.hp = max(0, target.hp - minigame.result_damage)
+                minigame = None
+            elif minigame is None and session is None:
+                shoot = player_shoot_check(masks, world)
+                if shoot is not None:
+                    shooter, target = shoot - 1, 2 - shoot
+                    world.rockets[shooter].mana = 0
+                    if len(play_panes) > 1:
+                        draw_panes(render_target, background, world, [duel_pane], None, snap=True)
+                        render_target.present()
+                        hud.draw(screen, world.rockets)
+                    minigame = MissileMinigame(
+                        shooter, target,
+                        camera.to_display(world.rockets[shooter].position), camera.to_display(world.rockets[target].position),
+                        screen.copy() if MINIGAME_PAUSES_WORLD else None,
+                        tracer,
+                    )
+                    muzzle = camera.to_world(minigame.start_vec)
+                    line_of_fire = world.rockets[target].position - muzzle
+                    blocker = world.raycast(muzzle, line_of_fire, line_of_fire.length())
+                    if blocker is not None:
+                        minigame.blocked_length = blocker[0] * camera.zoom
+                    if bot is not None and shooter == bot.player:
+                        minigame.submit_guess(bot.guess((minigame.target_vec - minigame.start_vec).length()))
+                else:
+                    player_fire_control(masks, world)
+            if advanced:
+                inputs.end_tick()
+            if profiler is not None:
+                profiler.count("input.latency_ms", round(inputs.latency_ms()))
+            work_ms = (time.perf_counter() - frame_start) * 1000.0
+            with tracer.span("idle"):
+                rate = TICK_RATE if world_running else MINIGAME_TICK_RATE
+                inputs.wait(frame_start + 1.0 / rate)
+                dt = clock.tick(rate)
+            if governor is not None:
+                governor.update(work_ms)
+            elif adaptive_scale:
+                render_target.adapt(work_ms)
+        if profiler is not None:
+            profiler.mark("idle")
+            profiler.end_frame()
 
 if __name__ == "__main__":
     main()
-
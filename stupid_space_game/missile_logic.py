@@ -1,7 +1,9 @@
 import pygame
+from typing import Dict, List, Optional, Tuple
 from pygame.math import Vector2
 from stupid_space_game.ui import get_game_font, get_numbers_ui, get_large_font
 from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, MISSILE_GRAIN
+import stupid_space_game.trace as trace
 
 TRIANGLE_COLOR = pygame.Color('yellow')
 HYPOTENUSE_COLOR = pygame.Color('magenta') # Original hypotenuse path
@@ -27,6 +29,11 @@ RESULT_TEXT_COLOR = pygame.Color('cyan') # For side labels in final state
 GUESS_VS_TRUE_COLOR = pygame.Color('lime') # For the guess/true comparison label
 PROMPT_TEXT_COLOR = pygame.Color('lightgray') # For user prompts
 
+GUESS_KEYS: Dict[int, int] = {
+    pygame.K_1: 1, pygame.K_2: 2, pygame.K_3: 3, pygame.K_4: 4, pygame.K_5: 5,
+    pygame.K_6: 6, pygame.K_7: 7, pygame.K_8: 8, pygame.K_9: 9, pygame.K_0: 10,
+}
+
 def clamp_rect_to_screen(rect: pygame.Rect) -> pygame.Rect:
     """Clamps a rectangle to the screen boundaries defined by global constants."""
     clamped_rect = rect.copy()
@@ -34,99 +41,31 @@ def clamp_rect_to_screen(rect: pygame.Rect) -> pygame.Rect:
     clamped_rect.clamp_ip(pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
     return clamped_rect
 
-def animate_missile_and_explosion(
-    screen: pygame.Surface,
-    original_frame: pygame.Surface,
-    clock: pygame.time.Clock, # Use the imported Clock
-    start_vec: Vector2,    # Use Vector2
-    target_vec: Vector2,   # Use Vector2
-    players_guess: int
-):
-    """Animates missile flight and explosion using Vector2."""
-    guessed_length_px = players_guess * MISSILE_GRAIN
-    # start_vec and target_vec are already vectors
-    direction_vec = target_vec - start_vec
-    true_length = direction_vec.length()
-
-    if true_length < 0.01:
-        print("Start/Target same, skipping animation.")
-        pygame.time.wait(100)
-        return
-
-    unit_vec = direction_vec.normalize()
-
-    # Convenience tuples for drawing functions (static points)
-    start_pos_tuple = (int(start_vec.x), int(start_vec.y))
-    target_pos_tuple = (int(target_vec.x), int(target_vec.y))
-    corner_pos_tuple = (int(target_vec.x), int(start_vec.y)) # Recalculate tuple form
-
-    # --- Phase 1: Missile Flight ---
-    current_missile_length = 0.0
-    while current_missile_length < guessed_length_px:
-        dt = clock.tick(160)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-
-        elapsed_time_frame = dt
-        current_missile_length += MISSILE_SPEED_PPT * (elapsed_time_frame / 1000.0)
-        current_missile_length = min(current_missile_length, guessed_length_px)
-
-        missile_end_vec = start_vec + unit_vec * current_missile_length
-        missile_end_pos_tuple = (int(missile_end_vec.x), int(missile_end_vec.y)) # Tuple for drawing
-
-        # Redraw basic scene for animation frame
-        screen.blit(original_frame, (0, 0))
-        if abs(target_vec.x - start_vec.x) > 0: pygame.draw.line(screen, TRIANGLE_COLOR, start_pos_tuple, corner_pos_tuple, LINE_WIDTH)
-        if abs(target_vec.y - start_vec.y) > 0: pygame.draw.line(screen, TRIANGLE_COLOR, corner_pos_tuple, target_pos_tuple, LINE_WIDTH)
-        pygame.draw.line(screen, HYPOTENUSE_COLOR, start_pos_tuple, target_pos_tuple, HYPOTENUSE_LINE_WIDTH)
-        pygame.draw.circle(screen, pygame.Color('pink'), start_pos_tuple, 10)
-        pygame.draw.circle(screen, pygame.Color('pink'), target_pos_tuple, 10)
-        if current_missile_length > 0.1: pygame.draw.line(screen, MISSILE_COLOR, start_pos_tuple, missile_end_pos_tuple, MISSILE_WIDTH)
-        pygame.display.flip()
-        if current_missile_length >= guessed_length_px: break
-
-    explosion_center_vec = start_vec + unit_vec * guessed_length_px
-    explosion_center_tuple = (int(explosion_center_vec.x), int(explosion_center_vec.y)) # Tuple for drawing
-
-    # --- Phase 2: Explosion ---
-    explosion_start_time = pygame.time.get_ticks()
-    current_explosion_time = 0
-    while current_explosion_time < EXPLOSION_DURATION_MS:
-        dt = clock.tick(160)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); exit()
-
-        current_explosion_time = pygame.time.get_ticks() - explosion_start_time
-        progress = min(current_explosion_time / EXPLOSION_DURATION_MS, 1.0)
-        radius_inner = progress * EXPLOSION_RADIUS_INNER_MAX
-        radius_outer = progress * EXPLOSION_RADIUS_OUTER_MAX
-
-        # Redraw basic scene for animation frame
-        screen.fill(pygame.Color('black'))
-        if abs(target_vec.x - start_vec.x) > 0: pygame.draw.line(screen, TRIANGLE_COLOR, start_pos_tuple, corner_pos_tuple, LINE_WIDTH)
-        if abs(target_vec.y - start_vec.y) > 0: pygame.draw.line(screen, TRIANGLE_COLOR, corner_pos_tuple, target_pos_tuple, LINE_WIDTH)
-        pygame.draw.line(screen, HYPOTENUSE_COLOR, start_pos_tuple, target_pos_tuple, HYPOTENUSE_LINE_WIDTH)
-        pygame.draw.circle(screen, pygame.Color('pink'), start_pos_tuple, 10)
-        pygame.draw.circle(screen, pygame.Color('pink'), target_pos_tuple, 10)
-        # Use explosion_center_tuple for missile and circles
-        if guessed_length_px > 0.1: pygame.draw.line(screen, MISSILE_COLOR, start_pos_tuple, explosion_center_tuple, MISSILE_WIDTH)
-        if radius_outer > 0: pygame.draw.circle(screen, EXPLOSION_COLOR_OUTER, explosion_center_tuple, int(radius_outer), 0)
-        if radius_inner > 0: pygame.draw.circle(screen, EXPLOSION_COLOR_INNER, explosion_center_tuple, int(radius_inner), 0)
-        pygame.display.flip()
+def score_shot(true_length: float, players_guess: int, blocked_length: Optional[float] = None) -> Tuple[str, float]:
+    if blocked_length is not None and players_guess*MISSILE_GRAIN > blocked_length:
+        return "Blocked!", 0
+    if abs(true_length - players_guess*MISSILE_GRAIN) <= EXPLOSION_RADIUS_INNER_MAX:
+        precision = 1 + 10*abs(players_guess - true_length / MISSILE_GRAIN)
+        return "Bullseye!", 100 / precision
+    if abs(true_length - players_guess*MISSILE_GRAIN) <= EXPLOSION_RADIUS_OUTER_MAX:
+        return "Scratched!", 20
+    return "Missed!", 0
 
 
 def draw_final_state(
     screen: pygame.Surface,
     start_vec: Vector2,       # Use Vector2
     target_vec: Vector2,      # Use Vector2
-    players_guess: int
+    players_guess: int,
+    blocked_length: Optional[float] = None,
 ) -> int:
     """Draws final scene using Vector2, global font, colors, and screen dimensions."""
     # GAME_FONT check removed, using get_game_font() directly
 
     # --- Calculations ---
-    result_damage = 0
     guessed_length_px = players_guess * MISSILE_GRAIN
+    if blocked_length is not None:
+        guessed_length_px = min(guessed_length_px, blocked_length)
     # start_vec, target_vec already vectors
     direction_vec = target_vec - start_vec
     true_length = direction_vec.length()
@@ -186,14 +125,7 @@ def draw_final_state(
     pygame.draw.circle(screen, EXPLOSION_COLOR_OUTER, explosion_center_tuple, EXPLOSION_RADIUS_OUTER_MAX, 0)
     pygame.draw.circle(screen, EXPLOSION_COLOR_INNER, explosion_center_tuple, EXPLOSION_RADIUS_INNER_MAX, 0)
 
-    result = "Missed!"
-    if abs(true_length - players_guess*MISSILE_GRAIN) <= EXPLOSION_RADIUS_INNER_MAX:
-        result = f"Bullseye!"
-        precision = 1 + 10*abs(players_guess - true_length / MISSILE_GRAIN)
-        result_damage = 100 / precision
-    elif abs(true_length - players_guess*MISSILE_GRAIN) <= EXPLOSION_RADIUS_OUTER_MAX:
-        result = "Scratched!"
-        result_damage = 20
+    result, result_damage = score_shot(true_length, players_guess, blocked_length)
 
     guess_vs_true_text = f"{result} | Missile: {players_guess} | true distance: {true_length / MISSILE_GRAIN: .1f}"
     prompt_surf = get_large_font().render(guess_vs_true_text, True, PROMPT_TEXT_COLOR)
@@ -254,102 +186,143 @@ def draw_right_triangle_with_labels(
 def round_down(x: int, grain: int):
     return (x // grain) * grain
 
-def missile_minigame(
-    screen: pygame.Surface,
-    clock: pygame.time.Clock,
-    start_vec: Vector2,
-    target_vec: Vector2,
-):  
-    diff_vector =  start_vec - target_vec
+def grain_start(start_vec: Vector2, target_vec: Vector2) -> Vector2:
+    diff_vector = start_vec - target_vec
     diff_vector.x = round_down(diff_vector.x, MISSILE_GRAIN)
     diff_vector.y = round_down(diff_vector.y, MISSILE_GRAIN)
-    start_vec = target_vec + diff_vector
-
-    original_frame = screen.convert() 
-    state = "SHOW_TRIANGLE"
-    running = True
-    # Initialize players_guess_units; it will be updated on click
-    players_guess_units = None
-    result_damage = 0
-    while running:
-        # --- Event Handling ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                pygame.quit() # Ensure pygame quits properly
-                exit() # Exit the script
-            if event.type == pygame.KEYDOWN:
-                 if state == "SHOW_TRIANGLE":
-                     if event.key == pygame.K_1:
-                        players_guess_units = 1
-                     elif event.key == pygame.K_2:
-                        players_guess_units = 2
-                     elif event.key == pygame.K_3:
-                        players_guess_units = 3
-                     elif event.key == pygame.K_4:
-                        players_guess_units = 4
-                     elif event.key == pygame.K_5:
-                        players_guess_units = 5
-                     elif event.key == pygame.K_6:
-                        players_guess_units = 6
-                     elif event.key == pygame.K_7:
-                        players_guess_units = 7
-                     elif event.key == pygame.K_8:
-                        players_guess_units = 8
-                     elif event.key == pygame.K_9:
-                        players_guess_units = 9
-                     elif event.key == pygame.K_0:
-                        players_guess_units = 10
-
-                     if players_guess_units is not None:
-                        print(f"Firing with guess: {players_guess_units} units") # Debug
-                        state = "ANIMATING"
-                 elif state == "POST_ANIMATION":
-                    return result_damage
-
-
-        # --- Game Logic & Drawing based on State ---
-        if state == "SHOW_TRIANGLE":
-            screen.blit(original_frame, (0, 0))
-            # Draw initial triangle using vectors and global font/dimensions
-            # Removed SCREEN_WIDTH, SCREEN_HEIGHT from call
-            # Draw circles using vector components as tuples
-            pygame.draw.circle(screen, pygame.Color('pink'), (int(start_vec.x), int(start_vec.y)), 10)
-            pygame.draw.circle(screen, pygame.Color('pink'), (int(target_vec.x), int(target_vec.y)), 10)
-
-            # Use get_game_font()
-            prompt_surf = get_game_font().render("Choose how far to launch the missile", True, PROMPT_TEXT_COLOR)
-            prompt_rect = prompt_surf.get_rect(center=(SCREEN_WIDTH // 2, 7*FONT_SIZE)) # Use global SCREEN_WIDTH
-            numbers_ui = get_numbers_ui()
-            numbers_rect = numbers_ui.get_rect()
-            numbers_rect.centerx = SCREEN_WIDTH // 2
-            numbers_rect.top = 50
-            screen.blit(numbers_ui, numbers_rect)
-            screen.blit(prompt_surf, prompt_rect)
-            draw_right_triangle_with_labels(screen, start_vec, target_vec)
-
-            pygame.display.flip()
-            clock.tick(30) # Use the passed clock object
-
-        elif state == "ANIMATING":
-            animate_missile_and_explosion(
-                screen, original_frame, clock,
-                start_vec, target_vec,
-                players_guess_units
-            )
-            state = "POST_ANIMATION"
-
-        elif state == "POST_ANIMATION":
-            screen.blit(original_frame, (0, 0))
-            # Draw final state using vectors and global font/dimensions
-            # Removed screen dimension arguments
-            result_damage = draw_final_state(screen,
-                             start_vec, target_vec,
-                             players_guess_units)
-
-            pygame.display.flip()
-            clock.tick(30) # Use the passed clock object
-
-    # Added explicit quit call if loop finishes unexpectedly (e.g., if running becomes False differently)
-    # Although the QUIT event above should handle normal exit.
-    # pygame.quit() # This might interfere if this minigame is part of a larger app
-    # exit()
+    return target_vec + diff_vector
+
+class MissileMinigame:
+    def __init__(
+        self,
+        shooter: int,
+        target: int,
+        start_vec: Vector2,
+        target_vec: Vector2,
+        backdrop: Optional[pygame.Surface],
+        tracer: trace.Tracer = trace.NULL_TRACE,
+    ) -> None:
+        self.tracer = tracer
+        self.shooter = shooter
+        self.target = target
+        self.target_vec = Vector2(target_vec)
+        self.start_vec = grain_start(start_vec, self.target_vec)
+        self.backdrop = backdrop
+        self.blocked_length: Optional[float] = None
+        self.state = "SHOW_TRIANGLE"
+        self.players_guess: Optional[int] = None
+        self.missile_length = 0.0
+        self.explosion_time = 0.0
+        self.result_damage = 0.0
+        self.finished = False
+        self.presented_state: Optional[str] = None
+        self.drawn_tip = Vector2(self.start_vec)
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        if event.type != pygame.KEYDOWN:
+            return
+        if self.state == "SHOW_TRIANGLE" and event.key in GUESS_KEYS:
+            self.submit_guess(GUESS_KEYS[event.key])
+        elif self.state == "POST_ANIMATION":
+            self.finished = True
+
+    def submit_guess(self, guess: int) -> None:
+        self.players_guess = guess
+        print(f"Firing with guess: {self.players_guess} units")
+        self.state = "ANIMATING"
+
+    def update(self, dt_ms: float) -> None:
+        if self.state != "ANIMATING":
+            return
+        guessed_length_px = self.players_guess * MISSILE_GRAIN
+        if self.blocked_length is not None:
+            guessed_length_px = min(guessed_length_px, self.blocked_length)
+        if (self.target_vec - self.start_vec).length() < 0.01:
+            self.missile_length = guessed_length_px
+            self.explosion_time = EXPLOSION_DURATION_MS
+        if self.missile_length < guessed_length_px:
+            self.missile_length = min(guessed_length_px, self.missile_length + MISSILE_SPEED_PPT * dt_ms / 1000.0)
+        elif self.explosion_time < EXPLOSION_DURATION_MS:
+            self.explosion_time = min(EXPLOSION_DURATION_MS, self.explosion_time + dt_ms)
+        else:
+            true_length = (self.target_vec - self.start_vec).length()
+            self.result_damage = score_shot(true_length, self.players_guess, self.blocked_length)[1]
+            self.state = "POST_ANIMATION"
+
+    def missile_tip(self) -> Vector2:
+        direction_vec = self.target_vec - self.start_vec
+        if direction_vec.length() < 0.01:
+            return Vector2(self.start_vec)
+        return self.start_vec + direction_vec.normalize() * self.missile_length
+
+    def draw(self, screen: pygame.Surface) -> List[pygame.Rect]:
+        with self.tracer.span("missile.draw"):
+            if self.backdrop is None:
+                self.draw_overlay(screen)
+                return [screen.get_rect()]
+            return self.draw_dirty(screen)
+
+    def draw_overlay(self, screen: pygame.Surface) -> None:
+        if self.state == "SHOW_TRIANGLE":
+            self.draw_prompt(screen)
+        elif self.state == "ANIMATING":
+            self.draw_triangle(screen)
+            tip = self.missile_tip()
+            if self.missile_length > 0.1:
+                pygame.draw.line(screen, MISSILE_COLOR, self.start_vec, tip, MISSILE_WIDTH)
+            self.draw_explosion(screen, tip)
+        elif self.state == "POST_ANIMATION":
+            draw_final_state(screen, self.start_vec, self.target_vec, self.players_guess, self.blocked_length)
+
+    def draw_dirty(self, screen: pygame.Surface) -> List[pygame.Rect]:
+        dirty: List[pygame.Rect] = []
+        if self.presented_state != self.state:
+            self.presented_state = self.state
+            screen.blit(self.backdrop, (0, 0))
+            if self.state == "SHOW_TRIANGLE":
+                self.draw_prompt(screen)
+            elif self.state == "ANIMATING":
+                self.draw_triangle(screen)
+                self.drawn_tip = Vector2(self.start_vec)
+            elif self.state == "POST_ANIMATION":
+                draw_final_state(screen, self.start_vec, self.target_vec, self.players_guess, self.blocked_length)
+            dirty.append(screen.get_rect())
+        if self.state == "ANIMATING":
+            tip = self.missile_tip()
+            if self.missile_length > 0.1 and tip != self.drawn_tip:
+                dirty.append(pygame.draw.line(screen, MISSILE_COLOR, self.drawn_tip, tip, MISSILE_WIDTH))
+                self.drawn_tip = tip
+            dirty.extend(self.draw_explosion(screen, tip))
+        return dirty
+
+    def draw_prompt(self, screen: pygame.Surface) -> None:
+        pygame.draw.circle(screen, pygame.Color('pink'), (int(self.start_vec.x), int(self.start_vec.y)), 10)
+        pygame.draw.circle(screen, pygame.Color('pink'), (int(self.target_vec.x), int(self.target_vec.y)), 10)
+        prompt_surf = get_game_font().render("Choose how far to launch the missile", True, PROMPT_TEXT_COLOR)
+        prompt_rect = prompt_surf.get_rect(center=(SCREEN_WIDTH // 2, 7*FONT_SIZE))
+        numbers_ui = get_numbers_ui()
+        numbers_rect = numbers_ui.get_rect()
+        numbers_rect.centerx = SCREEN_WIDTH // 2
+        numbers_rect.top = 50
+        screen.blit(numbers_ui, numbers_rect)
+        screen.blit(prompt_surf, prompt_rect)
+        draw_right_triangle_with_labels(screen, self.start_vec, self.target_vec)
+
+    def draw_triangle(self, screen: pygame.Surface) -> None:
+        start_pos_tuple = (int(self.start_vec.x), int(self.start_vec.y))
+        target_pos_tuple = (int(self.target_vec.x), int(self.target_vec.y))
+        corner_pos_tuple = (int(self.target_vec.x), int(self.start_vec.y))
+        if abs(self.target_vec.x - self.start_vec.x) > 0: pygame.draw.line(screen, TRIANGLE_COLOR, start_pos_tuple, corner_pos_tuple, LINE_WIDTH)
+        if abs(self.target_vec.y - self.start_vec.y) > 0: pygame.draw.line(screen, TRIANGLE_COLOR, corner_pos_tuple, target_pos_tuple, LINE_WIDTH)
+        pygame.draw.line(screen, HYPOTENUSE_COLOR, start_pos_tuple, target_pos_tuple, HYPOTENUSE_LINE_WIDTH)
+        pygame.draw.circle(screen, pygame.Color('pink'), start_pos_tuple, 10)
+        pygame.draw.circle(screen, pygame.Color('pink'), target_pos_tuple, 10)
+
+    def draw_explosion(self, screen: pygame.Surface, center: Vector2) -> List[pygame.Rect]:
+        progress = self.explosion_time / EXPLOSION_DURATION_MS
+        radius_outer = int(progress * EXPLOSION_RADIUS_OUTER_MAX)
+        radius_inner = int(progress * EXPLOSION_RADIUS_INNER_MAX)
+        dirty: List[pygame.Rect] = []
+        if radius_outer > 0: dirty.append(pygame.draw.circle(screen, EXPLOSION_COLOR_OUTER, center, radius_outer, 0))
+        if radius_inner > 0: dirty.append(pygame.draw.circle(screen, EXPLOSION_COLOR_INNER, center, radius_inner, 0))
+        return dirty
@@ -0,0 +1,103 @@
+from typing import List, NamedTuple, Optional
+import numpy as np
+import pygame
+from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, TICK_RATE
+from stupid_space_game.constants import MISSILE_POOL_CAPACITY, MISSILE_LIFETIME_S, MISSILE_SUBSTEPS
+import stupid_space_game.physics as physics
+
+MISSILE_LIFETIME_TICKS = int(MISSILE_LIFETIME_S * TICK_RATE)
+
+
+class MissileState(NamedTuple):
+    position: np.ndarray
+    velocity: np.ndarray
+    acceleration: np.ndarray
+    age: np.ndarray
+    owner: np.ndarray
+    alive: np.ndarray
+    free: List[int]
+
+
+class MissilePool:
+    def __init__(self, capacity: int = MISSILE_POOL_CAPACITY, bounds: Optional[pygame.Rect] = None) -> None:
+        self.capacity = capacity
+        self.position = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.acceleration = np.zeros((capacity, 2))
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.owner = np.full(capacity, -1, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+        if bounds is None:
+            bounds = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.origin = np.array(bounds.topleft, dtype=float)
+        self.bounds = np.array(bounds.size, dtype=float)
+
+    def spawn(self, x: float, y: float, vx: float, vy: float, owner: int) -> int:
+        if not self.free:
+            return -1
+        index = self.free.pop()
+        self.position[index] = (x, y)
+        self.velocity[index] = (vx, vy)
+        self.acceleration[index] = 0.0
+        self.age[index] = 0
+        self.owner[index] = owner
+        self.alive[index] = True
+        return index
+
+    def release(self, indices: np.ndarray) -> None:
+        for index in indices.tolist():
+            if self.alive[index]:
+                self.alive[index] = False
+                self.velocity[index] = 0.0
+                self.owner[index] = -1
+                self.free.append(index)
+
+    def active(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+    def update(self, centers: np.ndarray, masses: np.ndarray, substeps: int = MISSILE_SUBSTEPS) -> None:
+        active = self.active()
+        if len(active) == 0:
+            return
+        fresh = active[self.age[active] == 0]
+        if len(fresh) > 0:
+            self.acceleration[fresh] = physics.gravity_acceleration(self.position[fresh], centers, masses)
+        position = self.position[active]
+        velocity = self.velocity[active]
+        acceleration = self.acceleration[active]
+        dt = 1.0 / substeps
+        for _ in range(substeps):
+            velocity += 0.5 * dt * acceleration
+            position += dt * velocity
+            position -= self.origin
+            np.mod(position, self.bounds, out=position)
+            position += self.origin
+            acceleration = physics.gravity_acceleration(position, centers, masses)
+            velocity += 0.5 * dt * acceleration
+        self.position[active] = position
+        self.velocity[active] = velocity
+        self.acceleration[active] = acceleration
+        self.age[active] += 1
+        self.release(active[self.age[active] > MISSILE_LIFETIME_TICKS])
+
+    def state(self) -> MissileState:
+        return MissileState(
+            self.position.copy(), self.velocity.copy(), self.acceleration.copy(),
+            self.age.copy(), self.owner.copy(), self.alive.copy(), list(self.free),
+        )
+
+    def restore(self, state: MissileState) -> None:
+        self.position[:] = state.position
+        self.velocity[:] = state.velocity
+        self.acceleration[:] = state.acceleration
+        self.age[:] = state.age
+        self.owner[:] = state.owner
+        self.alive[:] = state.alive
+        self.free = list(state.free)
+
+    def energy(self, centers: np.ndarray, masses: np.ndarray) -> np.ndarray:
+        active = self.active()
+        velocity = self.velocity[active]
+        kinetic = 0.5 * np.einsum('ij,ij->i', velocity, velocity)
+        return kinetic + physics.gravity_potential(self.position[active], centers, masses)
@@ -0,0 +1,154 @@
+import random
+import socket
+import struct
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Tuple
+from stupid_space_game.constants import NETPLAY_INPUT_DELAY, NETPLAY_MAX_ROLLBACK, NETPLAY_HISTORY, NETPLAY_MAX_DATAGRAM
+from stupid_space_game.controls import mask_world_control
+from stupid_space_game.world import World, WorldSnapshot
+import stupid_space_game.trace as trace
+
+HEADER = struct.Struct('!IIH')
+
+Address = Tuple[str, int]
+
+
+class Delayed(NamedTuple):
+    due: float
+    data: bytes
+
+
+class UdpLink:
+    def __init__(self, local: Address, peer: Address, latency_ms: float = 0.0, loss: float = 0.0, seed: Optional[int] = None) -> None:
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(local)
+        self.sock.setblocking(False)
+        self.peer = peer
+        self.latency = latency_ms / 1000.0
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.outbox: Deque[Delayed] = deque()
+
+    def send(self, data: bytes) -> None:
+        if self.loss > 0 and self.rng.random() < self.loss:
+            return
+        self.outbox.append(Delayed(time.perf_counter() + self.latency, data))
+        self.flush()
+
+    def flush(self) -> None:
+        now = time.perf_counter()
+        while self.outbox and self.outbox[0].due <= now:
+            self.sock.sendto(self.outbox.popleft().data, self.peer)
+
+    def receive(self) -> List[bytes]:
+        self.flush()
+        packets = []
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(NETPLAY_MAX_DATAGRAM)
+            except BlockingIOError:
+                return packets
+            except ConnectionRefusedError:
+                continue
+            packets.append(data)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class RollbackSession:
+    def __init__(
+        self,
+        world: World,
+        local_player: int,
+        link: UdpLink,
+        input_delay: int = NETPLAY_INPUT_DELAY,
+        max_rollback: int = NETPLAY_MAX_ROLLBACK,
+        history: int = NETPLAY_HISTORY,
+        tracer: trace.Tracer = trace.NULL_TRACE,
+    ) -> None:
+        self.world = world
+        self.tracer = tracer
+        self.local_player = local_player
+        self.remote_player = 1 - local_player
+        self.link = link
+        self.max_rollback = max_rollback
+        self.history = history
+        self.frame = world.ticks
+        self.local_frame = world.ticks + input_delay - 1
+        self.remote_confirmed = self.local_frame
+        self.peer_ack = self.local_frame
+        self.inputs: List[List[int]] = [[0] * history for _ in range(2)]
+        self.snapshots: List[Optional[WorldSnapshot]] = [None] * history
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.stalls = 0
+        self.worst_rollback_ms = 0.0
+
+    def advance(self, local_mask: int) -> bool:
+        with self.tracer.span("netplay.advance"):
+            self.receive()
+            if self.frame - self.remote_confirmed > self.max_rollback:
+                self.stalls += 1
+                self.send()
+                return False
+            self.local_frame += 1
+            self.inputs[self.local_player][self.local_frame % self.history] = local_mask
+            self.send()
+            self.step()
+            return True
+
+    def send(self) -> None:
+        first = max(self.peer_ack + 1, self.local_frame - self.history + 1)
+        masks = bytes(self.inputs[self.local_player][frame % self.history] for frame in range(first, self.local_frame + 1))
+        self.link.send(HEADER.pack(first, self.remote_confirmed, len(masks)) + masks)
+
+    def receive(self) -> None:
+        rollback_to: Optional[int] = None
+        remote = self.inputs[self.remote_player]
+        for packet in self.link.receive():
+            first, ack, count = HEADER.unpack_from(packet)
+            self.peer_ack = max(self.peer_ack, ack)
+            if first > self.remote_confirmed + 1:
+                continue
+            masks = packet[HEADER.size:HEADER.size + count]
+            for frame in range(self.remote_confirmed + 1, first + count):
+                mask = masks[frame - first]
+                if frame < self.frame and remote[frame % self.history] != mask and rollback_to is None:
+                    rollback_to = frame
+                remote[frame % self.history] = mask
+                self.remote_confirmed = frame
+        if rollback_to is not None:
+            self.rollback(rollback_to)
+
+    def rollback(self, frame: int) -> None:
+        with self.tracer.span("netplay.rollback"):
+            start = time.perf_counter()
+            target = self.frame
+            self.world.restore(self.snapshots[frame % self.history])
+            self.frame = frame
+            effects = self.world.effects
+            self.world.effects = False
+            while self.frame < target:
+                self.step()
+            self.world.effects = effects
+            self.rollbacks += 1
+            self.resimulated += target - frame
+            self.worst_rollback_ms = max(self.worst_rollback_ms, (time.perf_counter() - start) * 1000.0)
+
+    def step(self) -> None:
+        frame = self.frame
+        slot = frame % self.history
+        if frame > self.remote_confirmed:
+            self.inputs[self.remote_player][slot] = self.inputs[self.remote_player][(frame - 1) % self.history]
+        self.snapshots[slot] = self.world.snapshot()
+        mask_world_control([inputs[slot] for inputs in self.inputs], self.world)
+        self.world.update()
+        self.frame += 1
+
+    def report(self) -> str:
+        return (
+            f"Netplay: {self.frame} ticks, {self.rollbacks} rollbacks re-simulating {self.resimulated} ticks "
+            f"(worst {self.worst_rollback_ms:.2f} ms), {self.stalls} stalled ticks"
+        )
@@ -0,0 +1,65 @@
+import math
+from typing import List, NamedTuple, Optional, Tuple
+import numpy as np
+from stupid_space_game.constants import PARTICLE_CAPACITY
+
+
+class Emitter(NamedTuple):
+    count: int
+    speed: float
+    spread: float
+    lifetime: int
+    drag: float
+    size: int
+    tint: Tuple[int, int, int]
+
+
+THRUSTER_EXHAUST = 0
+MISSILE_IMPACT = 1
+COLLISION_SPARKS = 2
+
+EMITTERS: List[Emitter] = [
+    Emitter(count=6, speed=7.0, spread=0.3, lifetime=10, drag=0.9, size=12, tint=(255, 170, 80)),
+    Emitter(count=64, speed=6.0, spread=math.pi, lifetime=24, drag=0.88, size=28, tint=(255, 190, 110)),
+    Emitter(count=20, speed=5.0, spread=1.2, lifetime=14, drag=0.85, size=9, tint=(255, 230, 120)),
+]
+
+
+class ParticlePool:
+    def __init__(self, capacity: int = PARTICLE_CAPACITY, seed: Optional[int] = None) -> None:
+        self.capacity = capacity
+        self.position = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.drag = np.ones((capacity, 1), dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.cursor = 0
+        self.rng = np.random.default_rng(seed)
+
+    def emit(self, kind: int, origins: np.ndarray, velocities: np.ndarray, headings: np.ndarray) -> None:
+        emitter = EMITTERS[kind]
+        count = min(len(origins) * emitter.count, self.capacity)
+        if count == 0:
+            return
+        slots = (self.cursor + np.arange(count)) % self.capacity
+        self.cursor = (self.cursor + count) % self.capacity
+        source = np.repeat(np.arange(len(origins)), emitter.count)[:count]
+        angle = headings[source] + self.rng.uniform(-emitter.spread, emitter.spread, count)
+        speed = emitter.speed * self.rng.uniform(0.4, 1.0, count)
+        self.position[slots] = origins[source]
+        self.velocity[slots] = velocities[source]
+        self.velocity[slots, 0] += speed * np.cos(angle)
+        self.velocity[slots, 1] += speed * np.sin(angle)
+        self.drag[slots] = emitter.drag
+        self.age[slots] = self.rng.integers(0, max(1, emitter.lifetime // 4), count)
+        self.lifetime[slots] = emitter.lifetime
+        self.kind[slots] = kind
+
+    def update(self) -> None:
+        self.position += self.velocity
+        self.velocity *= self.drag
+        np.minimum(self.age + 1, self.lifetime, out=self.age)
+
+    def live(self) -> np.ndarray:
+        return np.flatnonzero(self.age < self.lifetime)
@@ -1,7 +1,9 @@
 import pygame
 import math
-from typing import TYPE_CHECKING
-from stupid_space_game.constants import ROCKET_RADIUS
+import numpy as np
+from typing import TYPE_CHECKING, Optional, Tuple
+from stupid_space_game.constants import ROCKET_RADIUS, GRAVITY_FACTOR, MIN_GRAVITY_DISTANCE_SQ, MANA_GAIN, FULL_MANA
+import stupid_space_game.trace as trace
 # Avoid circular imports for type hinting
 if TYPE_CHECKING:
     from stupid_space_game.rockets import Rocket
@@ -10,8 +12,6 @@ if TYPE_CHECKING:
 BOUNCE_FACTOR = 0.7 # Restitution factor (0=no bounce, 1=perfect bounce)
 
 def check_rocket_celestial_collision(rocket: 'Rocket', celestial: 'CelestialEntity') -> bool:
-    if celestial.broad_check_cooldown > 0:
-        return False
     if not is_probably_colliding_broad_check(rocket, celestial):
         return False
     return rocket.position.distance_to(celestial.position) <= (ROCKET_RADIUS + celestial.radius)
@@ -29,33 +29,132 @@ def is_probably_colliding_broad_check(rocket: 'Rocket', celestial: 'CelestialEnt
     return True
 
 
-def resolve_rocket_celestial_collision(rocket: 'Rocket', celestial: 'CelestialEntity'):
+def resolve_rocket_celestial_collision(rocket: 'Rocket', celestial: 'CelestialEntity', tracer: trace.Tracer = trace.NULL_TRACE):
     """Resolves collision between a rocket and a celestial body by making the rocket bounce."""
-    # 1. Calculate collision normal (vector from celestial center to rocket center)
-    if rocket.position == celestial.position:
-        return None
-    normal = rocket.position - celestial.position
-    if normal.length() < ROCKET_RADIUS + celestial.radius:
-        rocket.position = celestial.position + normal.normalize() * (ROCKET_RADIUS + celestial.radius)
+    with tracer.span("physics.resolve_collision"):
+        # 1. Calculate collision normal (vector from celestial center to rocket center)
+        if rocket.position == celestial.position:
+            return None
+        normal = rocket.position - celestial.position
+        if normal.length() < ROCKET_RADIUS + celestial.radius:
+            rocket.position = celestial.position + normal.normalize() * (ROCKET_RADIUS + celestial.radius)
 
-    normal = normal.normalize()
+        normal = normal.normalize()
     
     
-    # 2. Calculate relative velocity
-    # Assuming celestial bodies are static or their velocity is negligible for bounce calculation
-    relative_v = rocket.velocity + celestial.orbit_velocity()
+        # 2. Calculate relative velocity
+        # Assuming celestial bodies are static or their velocity is negligible for bounce calculation
+        relative_v = rocket.velocity + celestial.orbit_velocity()
     
-    # 3. Calculate impulse scalar (dot product of relative velocity and normal)
-    impulse_scalar = relative_v.dot(normal)
+        # 3. Calculate impulse scalar (dot product of relative velocity and normal)
+        impulse_scalar = relative_v.dot(normal)
     
-    # charges manna proprotional to the impulse
-    rocket.mana += abs(impulse_scalar* 0.3) 
-    if rocket.mana > 100.0:
-        rocket.mana = 100.0
+        # charges manna proprotional to the impulse
+        rocket.mana += abs(impulse_scalar* MANA_GAIN) 
+        if rocket.mana > FULL_MANA:
+            rocket.mana = FULL_MANA
+
+        # 4. Calculate reflected velocity (only if moving towards each other)
+        if impulse_scalar < 0:
+            # Reflect velocity component along the normal
+            reflect_v = normal * (-2 * impulse_scalar)
+            rocket.velocity += reflect_v
+
+
+
+def circle_hits(
+    positions: np.ndarray,
+    radius: float,
+    borders: np.ndarray,
+    centers: np.ndarray,
+    radii: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    if len(positions) == 0 or len(borders) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    x = positions[:, 0:1]
+    y = positions[:, 1:2]
+    overlap = (
+        (x + radius >= borders[:, 0]) & (x - radius <= borders[:, 2]) &
+        (y + radius >= borders[:, 1]) & (y - radius <= borders[:, 3])
+    )
+    rows, bodies = np.nonzero(overlap)
+    if len(rows) == 0:
+        return rows, bodies
+    delta = positions[rows] - centers[bodies]
+    touching = np.einsum('ij,ij->i', delta, delta) <= (radius + radii[bodies]) ** 2
+    rows, bodies = rows[touching], bodies[touching]
+    rows, first = np.unique(rows, return_index=True)
+    return rows, bodies[first]
+
 
-    # 4. Calculate reflected velocity (only if moving towards each other)
-    if impulse_scalar < 0:
-        # Reflect velocity component along the normal
-        reflect_v = normal * (-2 * impulse_scalar)
-        rocket.velocity += reflect_v
+def gravity_acceleration(positions: np.ndarray, centers: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    delta = centers[np.newaxis, :, :] - positions[:, np.newaxis, :]
+    distance_sq = np.maximum(np.einsum('ijk,ijk->ij', delta, delta), MIN_GRAVITY_DISTANCE_SQ)
+    strength = GRAVITY_FACTOR * masses / (distance_sq * np.sqrt(distance_sq))
+    return np.einsum('ij,ijk->ik', strength, delta)
 
+
+def gravity_potential(positions: np.ndarray, centers: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    delta = centers[np.newaxis, :, :] - positions[:, np.newaxis, :]
+    distance_sq = np.maximum(np.einsum('ijk,ijk->ij', delta, delta), MIN_GRAVITY_DISTANCE_SQ)
+    return -GRAVITY_FACTOR * (masses / np.sqrt(distance_sq)).sum(axis=1)
+
+
+def raycast_many(
+    origins: np.ndarray,
+    directions: np.ndarray,
+    max_lengths: np.ndarray,
+    borders: np.ndarray,
+    centers: np.ndarray,
+    radii: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    count = len(origins)
+    distances = np.full(count, np.inf)
+    bodies = np.full(count, -1, dtype=np.intp)
+    if count == 0 or len(borders) == 0:
+        return distances, bodies
+    lengths = np.sqrt(np.einsum('ij,ij->i', directions, directions))
+    max_lengths = np.broadcast_to(np.asarray(max_lengths, dtype=float), (count,))
+    units = directions / np.maximum(lengths, 1e-12)[:, np.newaxis]
+    ends = origins + units * max_lengths[:, np.newaxis]
+    low = np.minimum(origins, ends)
+    high = np.maximum(origins, ends)
+    overlap = (
+        (lengths[:, np.newaxis] > 0) &
+        (high[:, 0:1] >= borders[:, 0]) & (low[:, 0:1] <= borders[:, 2]) &
+        (high[:, 1:2] >= borders[:, 1]) & (low[:, 1:2] <= borders[:, 3])
+    )
+    rows, candidates = np.nonzero(overlap)
+    if len(rows) == 0:
+        return distances, bodies
+    offset = origins[rows] - centers[candidates]
+    along = np.einsum('ij,ij->i', offset, units[rows])
+    outside = np.einsum('ij,ij->i', offset, offset) - radii[candidates] ** 2
+    discriminant = along * along - outside
+    entry = -along - np.sqrt(np.maximum(discriminant, 0.0))
+    hit = (outside > 0) & (discriminant >= 0) & (entry >= 0) & (entry <= max_lengths[rows])
+    rows, candidates, entry = rows[hit], candidates[hit], entry[hit]
+    order = np.lexsort((entry, rows))
+    rows, first = np.unique(rows[order], return_index=True)
+    distances[rows] = entry[order][first]
+    bodies[rows] = candidates[order][first]
+    return distances, bodies
+
+
+def raycast(
+    origin: Tuple[float, float],
+    direction: Tuple[float, float],
+    max_length: float,
+    borders: np.ndarray,
+    centers: np.ndarray,
+    radii: np.ndarray,
+) -> Optional[Tuple[float, int]]:
+    distances, bodies = raycast_many(
+        np.array([origin], dtype=float),
+        np.array([direction], dtype=float),
+        np.array([max_length], dtype=float),
+        borders, centers, radii,
+    )
+    if bodies[0] < 0:
+        return None
+    return float(distances[0]), int(bodies[0])
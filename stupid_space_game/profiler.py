@@ -0,0 +1,123 @@
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+import pygame
+from stupid_space_game.constants import TICK_RATE, PROFILER_WINDOW, PROFILER_OVERLAY_REFRESH
+from stupid_space_game.constants import OVERLAY_POSITION, OVERLAY_WIDTH, OVERLAY_LINE_HEIGHT, OVERLAY_GRAPH_HEIGHT
+from stupid_space_game.constants import OVERLAY_BACKGROUND, OVERLAY_TEXT_COLOR, OVERLAY_GRAPH_COLOR, OVERLAY_BUDGET_COLOR
+from stupid_space_game.constants import OVERLAY_MAX_STAGES, OVERLAY_FONT_SIZE, OVERLAY_COLUMNS
+
+
+class FrameCapture(NamedTuple):
+    frame_ms: float
+    stages: Dict[str, float]
+
+
+class StageSummary(NamedTuple):
+    name: str
+    p50: float
+    p95: float
+    p99: float
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+def summarize(name: str, samples: Deque[float]) -> StageSummary:
+    ordered = sorted(samples)
+    return StageSummary(name, percentile(ordered, 0.5), percentile(ordered, 0.95), percentile(ordered, 0.99))
+
+
+class FrameProfiler:
+    def __init__(self, window: int = PROFILER_WINDOW) -> None:
+        self.window = window
+        self.budget_ms = 1000.0 / TICK_RATE
+        self.frame_times: Deque[float] = deque(maxlen=window)
+        self.stage_times: Dict[str, Deque[float]] = {}
+        self.captures: Deque[FrameCapture] = deque(maxlen=window)
+        self.current: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.frames_since_refresh = PROFILER_OVERLAY_REFRESH
+        self.overlay: Optional[pygame.Surface] = None
+        self.font = pygame.font.SysFont('monospace', OVERLAY_FONT_SIZE)
+
+    def begin_frame(self) -> None:
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.current = {}
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.current[stage] = self.current.get(stage, 0.0) + (now - self.last_mark) * 1000.0
+        self.last_mark = now
+
+    def count(self, counter: str, value: int) -> None:
+        self.counters[counter] = value
+
+    def end_frame(self) -> None:
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000.0
+        self.frame_times.append(frame_ms)
+        for stage, ms in self.current.items():
+            samples = self.stage_times.get(stage)
+            if samples is None:
+                samples = self.stage_times[stage] = deque(maxlen=self.window)
+            samples.append(ms)
+        self.captures.append(FrameCapture(frame_ms, self.current))
+
+    def summary(self) -> List[StageSummary]:
+        stages = [summarize(name, samples) for name, samples in self.stage_times.items()]
+        stages.sort(key=lambda stage: stage.p95, reverse=True)
+        return [summarize("frame", self.frame_times)] + stages
+
+    def export(self, path: str) -> None:
+        capture = {
+            "tick_rate": TICK_RATE,
+            "budget_ms": self.budget_ms,
+            "summary": [stage._asdict() for stage in self.summary()],
+            "frames": [frame._asdict() for frame in self.captures],
+        }
+        with open(path, "w") as capture_file:
+            json.dump(capture, capture_file, indent=1)
+        print(f"Profiler capture written to {path}")
+
+    def render_overlay(self) -> pygame.Surface:
+        stages = self.summary()[:OVERLAY_MAX_STAGES]
+        height = OVERLAY_GRAPH_HEIGHT + (len(stages) + 2) * OVERLAY_LINE_HEIGHT + 10
+        overlay = pygame.Surface((OVERLAY_WIDTH, height), pygame.SRCALPHA)
+        overlay.fill(OVERLAY_BACKGROUND)
+        scale = OVERLAY_GRAPH_HEIGHT / (2 * self.budget_ms)
+        budget_y = OVERLAY_GRAPH_HEIGHT - int(self.budget_ms * scale)
+        pygame.draw.line(overlay, OVERLAY_BUDGET_COLOR, (0, budget_y), (OVERLAY_WIDTH, budget_y))
+        bar_width = OVERLAY_WIDTH / self.window
+        for i, frame_ms in enumerate(self.frame_times):
+            bar_height = min(OVERLAY_GRAPH_HEIGHT, int(frame_ms * scale))
+            pygame.draw.line(
+                overlay, OVERLAY_GRAPH_COLOR,
+                (int(i * bar_width), OVERLAY_GRAPH_HEIGHT),
+                (int(i * bar_width), OVERLAY_GRAPH_HEIGHT - bar_height)
+            )
+        y = OVERLAY_GRAPH_HEIGHT + 5
+        self.blit_row(overlay, y, ("stage", "p50 ms", "p95 ms", "p99 ms"))
+        for stage in stages:
+            y += OVERLAY_LINE_HEIGHT
+            self.blit_row(overlay, y, (stage.name, f"{stage.p50:.2f}", f"{stage.p95:.2f}", f"{stage.p99:.2f}"))
+        counters = "  ".join(f"{counter} {value}" for counter, value in self.counters.items())
+        overlay.blit(self.font.render(counters, True, OVERLAY_TEXT_COLOR), (OVERLAY_COLUMNS[0], y + OVERLAY_LINE_HEIGHT))
+        return overlay
+
+    def blit_row(self, overlay: pygame.Surface, y: int, cells: Tuple[str, str, str, str]) -> None:
+        for column_x, cell in zip(OVERLAY_COLUMNS, cells):
+            overlay.blit(self.font.render(cell, True, OVERLAY_TEXT_COLOR), (column_x, y))
+
+    def draw(self, screen: pygame.Surface) -> None:
+        self.frames_since_refresh += 1
+        if self.overlay is None or self.frames_since_refresh >= PROFILER_OVERLAY_REFRESH:
+            self.overlay = self.render_overlay()
+            self.frames_since_refresh = 0
+        screen.blit(self.overlay, OVERLAY_POSITION)
@@ -0,0 +1,66 @@
+from collections import deque
+from typing import Deque, List, NamedTuple
+from stupid_space_game.constants import TICK_RATE, QUALITY_WINDOW, QUALITY_DEGRADE_LOAD, QUALITY_RESTORE_LOAD
+import stupid_space_game.graphics as graphics
+
+
+class QualityLevel(NamedTuple):
+    name: str
+    oscillate_background: bool
+    animate: bool
+    orbit_rings: bool
+    render_scale: float
+    corona_frames: int
+    corona_resolution: float
+
+
+QUALITY_LEVELS: List[QualityLevel] = [
+    QualityLevel("full", True, True, True, 1.0, 48, 1.0),
+    QualityLevel("static background", False, True, True, 1.0, 48, 1.0),
+    QualityLevel("frozen planet animation", False, False, True, 1.0, 12, 0.5),
+    QualityLevel("no orbit rings", False, False, False, 1.0, 12, 0.5),
+    QualityLevel("75% render resolution", False, False, False, 0.75, 12, 0.5),
+    QualityLevel("50% render resolution", False, False, False, 0.5, 12, 0.5),
+]
+
+
+class QualityGovernor:
+    def __init__(self, render_target: graphics.RenderTarget) -> None:
+        self.render_target = render_target
+        self.max_scale = render_target.scale
+        self.budget_ms = 1000.0 / TICK_RATE
+        self.frame_times: Deque[float] = deque(maxlen=QUALITY_WINDOW)
+        self.level = 0
+        self.apply(QUALITY_LEVELS[0])
+
+    def apply(self, level: QualityLevel) -> None:
+        self.render_target.view = self.render_target.view._replace(
+            oscillate_background=level.oscillate_background,
+            animate=level.animate,
+            orbit_rings=level.orbit_rings,
+            corona_frames=level.corona_frames,
+            corona_resolution=level.corona_resolution,
+        )
+        scale = min(self.max_scale, level.render_scale)
+        if scale != self.render_target.scale:
+            self.render_target.set_scale(scale)
+
+    def set_level(self, level: int, reason: str) -> None:
+        self.level = level
+        self.apply(QUALITY_LEVELS[level])
+        self.frame_times.clear()
+        print(f"Quality level {level} ({QUALITY_LEVELS[level].name}): {reason}")
+
+    def update(self, frame_ms: float) -> None:
+        self.frame_times.append(frame_ms)
+        if len(self.frame_times) < QUALITY_WINDOW:
+            return
+        average_ms = sum(self.frame_times) / len(self.frame_times)
+        degrade_ms = self.budget_ms * QUALITY_DEGRADE_LOAD
+        restore_ms = self.budget_ms * QUALITY_RESTORE_LOAD
+        if average_ms > degrade_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.set_level(self.level + 1, f"average frame work {average_ms:.1f} ms is over {degrade_ms:.1f} ms")
+        elif average_ms < restore_ms and self.level > 0:
+            self.set_level(self.level - 1, f"average frame work {average_ms:.1f} ms is under {restore_ms:.1f} ms")
+        else:
+            self.frame_times.clear()
@@ -1,12 +1,35 @@
-from typing import Tuple
+from typing import NamedTuple, Optional, Tuple
 import pygame
 import math
 import stupid_space_game.graphics as graphics
+import stupid_space_game.trace as trace
 from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, COLLISION_BUFFER
-from stupid_space_game.constants import DEFAULT_HP
+from stupid_space_game.constants import DEFAULT_HP, COAST_SPEED, COAST_DRAG
+
+class RocketState(NamedTuple):
+    hp: float
+    mana: float
+    x: float
+    y: float
+    vx: float
+    vy: float
+    rotation: float
+    thrust_x: float
+    thrust_y: float
+    thrusters: bool
+    fire_cooldown: int
+
 
 class Rocket:
-    def __init__(self, x: float = 0, y: float = 0, rotation: float = 0) -> None:
+    def __init__(
+        self,
+        x: float = 0,
+        y: float = 0,
+        rotation: float = 0,
+        bounds: Optional[pygame.Rect] = None,
+        headless: bool = False,
+        tracer: trace.Tracer = trace.NULL_TRACE,
+    ) -> None:
         self.hp = DEFAULT_HP
         self.mana = 0.0
         self.position = pygame.math.Vector2(x, y)
@@ -14,12 +37,16 @@ class Rocket:
         self.rotation = rotation
         self.thrust = pygame.math.Vector2(0, 0)
         self.thrusters = False
-        self.graphics = graphics.RocketGraphics()
+        self.fire_cooldown = 0
+        self.bounds = bounds if bounds is not None else pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.graphics = None if headless else graphics.RocketGraphics(tracer)
         self.calc_collision_rect()
 
 
 
     def update(self) -> None:
+        if self.fire_cooldown > 0:
+            self.fire_cooldown -= 1
         if self.thrust.length() > 0:
             self.thrusters = True
             self.rotation = math.degrees(math.atan2(self.thrust.x, -self.thrust.y))
@@ -27,20 +54,37 @@ class Rocket:
             self.thrusters = False
             self.rotation = math.degrees(math.atan2(self.velocity.x, -self.velocity.y))
             # if the rocket is too fast, slow down the rocket a bit
-            if self.velocity.length() > 10:
-                self.velocity *= 0.99
+            if self.velocity.length() > COAST_SPEED:
+                self.velocity *= COAST_DRAG
 
         self.velocity += self.thrust
         self.position += self.velocity
-        # Wrap around screen edges (Atari-style)
-        if self.position.x < 0:
-            self.position.x = SCREEN_WIDTH
-        elif self.position.x > SCREEN_WIDTH:
-            self.position.x = 0
-        if self.position.y < 0:
-            self.position.y = SCREEN_HEIGHT
-        elif self.position.y > SCREEN_HEIGHT:
-            self.position.y = 0
+        # Wrap around world edges (Atari-style)
+        if self.position.x < self.bounds.left:
+            self.position.x = self.bounds.right
+        elif self.position.x > self.bounds.right:
+            self.position.x = self.bounds.left
+        if self.position.y < self.bounds.top:
+            self.position.y = self.bounds.bottom
+        elif self.position.y > self.bounds.bottom:
+            self.position.y = self.bounds.top
+        self.calc_collision_rect()
+
+    def state(self) -> RocketState:
+        return RocketState(
+            self.hp, self.mana, self.position.x, self.position.y, self.velocity.x, self.velocity.y,
+            self.rotation, self.thrust.x, self.thrust.y, self.thrusters, self.fire_cooldown,
+        )
+
+    def restore(self, state: RocketState) -> None:
+        self.hp = state.hp
+        self.mana = state.mana
+        self.position.update(state.x, state.y)
+        self.velocity.update(state.vx, state.vy)
+        self.rotation = state.rotation
+        self.thrust.update(state.thrust_x, state.thrust_y)
+        self.thrusters = state.thrusters
+        self.fire_cooldown = state.fire_cooldown
         self.calc_collision_rect()
 
     def calc_collision_rect(self):
@@ -51,7 +95,7 @@ class Rocket:
             self.position.y + COLLISION_BUFFER
         )
 
-    def draw(self, screen: pygame.Surface) -> None:
-        self.graphics.draw(screen, self.position, self.rotation, self.thrusters)
+    def draw(self, queue: graphics.RenderQueue, view: graphics.View = graphics.FULL_VIEW) -> None:
+        queue.push(graphics.LAYER_ROCKETS, *self.graphics.sprite(self.position, self.rotation, self.thrusters, view))
 
 
@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from typing import Deque, Dict, List, Set
+from stupid_space_game.constants import TICK_RATE, SERVER_PORT, SERVER_MATCHES, SERVER_REPORT_S, SERVER_WRITE_BUFFER
+from stupid_space_game.controls import mask_world_control
+from stupid_space_game.profiler import percentile
+from stupid_space_game.stream import StreamEncoder, framed
+from stupid_space_game.world import World
+
+
+def shard_port(match_id: int, shards: int, port: int = SERVER_PORT) -> int:
+    return port + match_id % shards
+
+
+class Match:
+    def __init__(self, match_id: int) -> None:
+        self.match_id = match_id
+        self.world = World(headless=True)
+        self.masks = [0] * len(self.world.rockets)
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self.joining: Set[asyncio.StreamWriter] = set()
+        self.encoder = StreamEncoder(len(self.world.rockets), self.world.missiles.capacity)
+        self.tick_costs: Deque[float] = deque(maxlen=SERVER_REPORT_S * TICK_RATE)
+        self.rounds = 0
+
+    def tick(self) -> None:
+        start = time.perf_counter()
+        mask_world_control(self.masks, self.world)
+        self.world.update()
+        if any(rocket.hp <= 0 for rocket in self.world.rockets):
+            self.world = World(headless=True)
+            self.encoder = StreamEncoder(len(self.world.rockets), self.world.missiles.capacity)
+            self.joining |= self.clients
+            self.clients.clear()
+            self.rounds += 1
+        if self.clients or self.joining:
+            self.broadcast()
+        self.tick_costs.append((time.perf_counter() - start) * 1000.0)
+
+    def broadcast(self) -> None:
+        missiles = self.world.missiles
+        frame = framed(self.encoder.encode(
+            self.world.ticks, [rocket.state() for rocket in self.world.rockets], missiles.alive, missiles.position,
+        ))
+        for writer in list(self.clients):
+            self.send(writer, frame)
+        if self.joining:
+            keyframe = framed(self.encoder.keyframe())
+            for writer in list(self.joining):
+                self.send(writer, keyframe)
+            self.clients |= self.joining
+            self.joining.clear()
+
+    def send(self, writer: asyncio.StreamWriter, frame: bytes) -> None:
+        if writer.transport.get_write_buffer_size() > SERVER_WRITE_BUFFER:
+            print(f"Match {self.match_id}: dropping a client that fell behind")
+            self.leave(writer)
+            writer.close()
+            return
+        writer.write(frame)
+
+    def leave(self, writer: asyncio.StreamWriter) -> None:
+        self.clients.discard(writer)
+        self.joining.discard(writer)
+
+
+class MatchServer:
+    def __init__(self, match_ids: List[int], shard: int = 0) -> None:
+        self.shard = shard
+        self.matches: Dict[int, Match] = {match_id: Match(match_id) for match_id in match_ids}
+        self.loop_costs: Deque[float] = deque(maxlen=SERVER_REPORT_S * TICK_RATE)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            match_id, player = (int(field) for field in (await reader.readline()).split())
+        except ValueError:
+            writer.close()
+            return
+        match = self.matches.get(match_id)
+        if match is None or not 0 <= player <= len(match.masks):
+            writer.close()
+            return
+        match.joining.add(writer)
+        try:
+            while True:
+                data = await reader.read(64)
+                if not data:
+                    break
+                if player > 0:
+                    match.masks[player - 1] = data[-1]
+        except ConnectionError:
+            pass
+        finally:
+            match.leave(writer)
+            writer.close()
+
+    async def run_ticks(self) -> None:
+        period = 1.0 / TICK_RATE
+        next_tick = last_report = time.perf_counter()
+        while True:
+            start = time.perf_counter()
+            for match in self.matches.values():
+                match.tick()
+            self.loop_costs.append((time.perf_counter() - start) * 1000.0)
+            if start - last_report >= SERVER_REPORT_S:
+                print(self.report())
+                last_report = start
+            next_tick += period
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                next_tick -= delay
+                delay = 0.0
+            await asyncio.sleep(delay)
+
+    def report(self) -> str:
+        costs = sorted(cost for match in self.matches.values() for cost in match.tick_costs)
+        loop = sorted(self.loop_costs)
+        clients = sum(len(match.clients) for match in self.matches.values())
+        load = percentile(loop, 0.5) * TICK_RATE / 1000.0
+        return (
+            f"Shard {self.shard}: {len(self.matches)} matches, {clients} clients, "
+            f"match tick p50 {percentile(costs, 0.5):.3f} ms p99 {percentile(costs, 0.99):.3f} ms, "
+            f"scheduler p50 {percentile(loop, 0.5):.2f} ms ({load:.0%} of a tick)"
+        )
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Shard {self.shard} hosting {len(self.matches)} matches on {host}:{port}")
+        async with server:
+            await self.run_ticks()
+
+
+def run_shard(shard: int, shards: int, matches: int, host: str, port: int) -> None:
+    server = MatchServer(list(range(shard, matches, shards)), shard)
+    try:
+        asyncio.run(server.serve(host, port + shard))
+    except KeyboardInterrupt:
+        pass
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Triangles in Space! match server")
+    parser.add_argument('--matches', type=int, default=SERVER_MATCHES, help="number of headless matches to host")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes to shard the matches over")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="port of the first shard; shard N listens N ports above it")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.workers <= 1:
+        run_shard(0, 1, args.matches, args.host, args.port)
+        return
+    workers = [
+        multiprocessing.Process(target=run_shard, args=(shard, args.workers, args.matches, args.host, args.port))
+        for shard in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.join()
+
+
+if __name__ == "__main__":
+    main()
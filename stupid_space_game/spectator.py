@@ -0,0 +1,87 @@
+import argparse
+import socket
+import sys
+import time
+import pygame
+from stupid_space_game.constants import SCREEN_WIDTH, TICK_RATE, SERVER_PORT, STREAM_POSITION_STEPS, STREAM_ROTATION_STEP
+import stupid_space_game.graphics as graphics
+from stupid_space_game.world import World
+from stupid_space_game.camera import shared_pane
+from stupid_space_game.server import shard_port
+from stupid_space_game.stream import FrameReader, StreamDecoder, ROTATION, THRUSTERS, HP, MANA
+import stupid_space_game.ui as ui
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Watch a Triangles in Space! server match")
+    parser.add_argument('match', type=int, help="id of the match to watch")
+    parser.add_argument('--host', default='127.0.0.1', help="match server address")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="port of the server's first shard")
+    parser.add_argument('--shards', type=int, default=1, help="number of shards the server runs")
+    return parser.parse_args()
+
+
+def apply_stream(decoder: StreamDecoder, world: World) -> None:
+    mirror = decoder.mirror
+    world.place_orbits(mirror.tick)
+    for rocket, (x, y), row in zip(world.rockets, decoder.rocket_positions().tolist(), mirror.rockets.tolist()):
+        rocket.position.update(x, y)
+        rocket.rotation = row[ROTATION] * STREAM_ROTATION_STEP
+        rocket.thrusters = bool(row[THRUSTERS])
+        rocket.hp = row[HP]
+        rocket.mana = row[MANA]
+    slots, positions = decoder.missile_positions()
+    world.missiles.alive[:] = mirror.alive
+    world.missiles.position[slots] = positions
+    world.missiles.velocity[slots] = (mirror.missiles[slots] - mirror.missile_trail[slots]) / STREAM_POSITION_STEPS
+
+
+def main():
+    args = parse_args()
+    connection = socket.create_connection((args.host, shard_port(args.match, args.shards, args.port)))
+    connection.sendall(f"{args.match} 0\n".encode())
+    connection.setblocking(False)
+    screen = graphics.init_graphics()
+    ui.ui_init()
+    render_target = graphics.RenderTarget(screen)
+    world = World()
+    pane = shared_pane(world.bounds)
+    background = graphics.BackgroundGraphics()
+    hud = ui.FighterHud(SCREEN_WIDTH, len(world.rockets))
+    frames = FrameReader()
+    decoder = StreamDecoder(len(world.rockets), world.missiles.capacity)
+    received = 0
+    started = time.perf_counter()
+    clock = pygame.time.Clock()
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                elapsed = time.perf_counter() - started
+                print(f"Received {received} bytes in {elapsed:.0f} s, {received / elapsed:.0f} bytes/s")
+                connection.close()
+                pygame.quit()
+                sys.exit()
+        try:
+            data = connection.recv(65536)
+            if not data:
+                print("Server closed the stream")
+                pygame.quit()
+                sys.exit()
+        except BlockingIOError:
+            data = b''
+        received += len(data)
+        for payload in frames.feed(data):
+            decoder.decode(payload)
+        if decoder.synced:
+            apply_stream(decoder, world)
+        background.update(render_target.view)
+        background.draw(render_target.surface, render_target.view)
+        pane.camera.frame([rocket.position for rocket in world.rockets])
+        world.draw(render_target.surface, pane.camera.apply(render_target.view))
+        hud.draw(screen, world.rockets)
+        pygame.display.update()
+        clock.tick(TICK_RATE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+from typing import List, Tuple
+import numpy as np
+from stupid_space_game.constants import STREAM_POSITION_STEPS, STREAM_ROTATION_STEP
+from stupid_space_game.rockets import RocketState
+
+X = 0
+Y = 1
+ROTATION = 2
+THRUSTERS = 3
+HP = 4
+MANA = 5
+ROCKET_FIELDS = 6
+ROTATION_STEPS = 360 // STREAM_ROTATION_STEP
+
+MISSILE_UPDATE = 0
+MISSILE_SPAWN = 1
+MISSILE_DESPAWN = 2
+
+
+def zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def get_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def framed(payload: bytes) -> bytes:
+    out = bytearray()
+    put_varint(out, len(payload))
+    return bytes(out) + payload
+
+
+def quantize_rockets(states: List[RocketState]) -> np.ndarray:
+    return np.array([
+        (
+            round(state.x * STREAM_POSITION_STEPS),
+            round(state.y * STREAM_POSITION_STEPS),
+            round(state.rotation / STREAM_ROTATION_STEP) % ROTATION_STEPS,
+            int(state.thrusters),
+            round(state.hp),
+            round(state.mana),
+        )
+        for state in states
+    ], dtype=np.int64)
+
+
+def quantize_positions(positions: np.ndarray) -> np.ndarray:
+    return np.rint(positions * STREAM_POSITION_STEPS).astype(np.int64)
+
+
+class FrameReader:
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        self.buffer += data
+        payloads = []
+        offset = 0
+        while offset < len(self.buffer):
+            try:
+                length, start = get_varint(self.buffer, offset)
+            except IndexError:
+                break
+            if start + length > len(self.buffer):
+                break
+            payloads.append(bytes(self.buffer[start:start + length]))
+            offset = start + length
+        del self.buffer[:offset]
+        return payloads
+
+
+class StreamMirror:
+    def __init__(self, rockets: int, capacity: int) -> None:
+        self.tick = 0
+        self.rockets = np.zeros((rockets, ROCKET_FIELDS), dtype=np.int64)
+        self.rocket_trail = np.zeros((rockets, 2), dtype=np.int64)
+        self.missiles = np.zeros((capacity, 2), dtype=np.int64)
+        self.missile_trail = np.zeros((capacity, 2), dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def predicted_rockets(self) -> np.ndarray:
+        predicted = self.rockets.copy()
+        predicted[:, :2] = 2 * self.rockets[:, :2] - self.rocket_trail
+        return predicted
+
+    def predicted_missiles(self, slots: np.ndarray) -> np.ndarray:
+        return 2 * self.missiles[slots] - self.missile_trail[slots]
+
+    def move_rockets(self, rockets: np.ndarray) -> None:
+        self.rocket_trail[:] = self.rockets[:, :2]
+        self.rockets[:] = rockets
+
+    def move_missiles(self, staying: np.ndarray, positions: np.ndarray, spawned: np.ndarray, spawn_positions: np.ndarray, despawned: np.ndarray) -> None:
+        self.missile_trail[staying] = self.missiles[staying]
+        self.missiles[staying] = positions
+        self.missiles[spawned] = spawn_positions
+        self.missile_trail[spawned] = spawn_positions
+        self.alive[spawned] = True
+        self.alive[despawned] = False
+
+
+class StreamEncoder:
+    def __init__(self, rockets: int, capacity: int) -> None:
+        self.mirror = StreamMirror(rockets, capacity)
+
+    def encode(self, tick: int, rockets: List[RocketState], alive: np.ndarray, positions: np.ndarray) -> bytes:
+        mirror = self.mirror
+        out = bytearray()
+        put_varint(out, (tick - mirror.tick) << 1)
+        mirror.tick = tick
+        current = quantize_rockets(rockets)
+        residuals = current - mirror.predicted_rockets()
+        for residual in residuals.tolist():
+            changed = [field for field in range(ROCKET_FIELDS) if residual[field]]
+            out.append(sum(1 << field for field in changed))
+            for field in changed:
+                put_varint(out, zigzag(residual[field]))
+        mirror.move_rockets(current)
+        if not alive.any() and not mirror.alive.any():
+            put_varint(out, 0)
+            return bytes(out)
+        staying = np.flatnonzero(alive & mirror.alive)
+        spawned = np.flatnonzero(alive & ~mirror.alive)
+        despawned = np.flatnonzero(~alive & mirror.alive)
+        quantized = quantize_positions(positions[staying])
+        spawn_positions = quantize_positions(positions[spawned])
+        residuals = quantized - mirror.predicted_missiles(staying)
+        moved = np.any(residuals != 0, axis=1)
+        slots = np.concatenate((staying[moved], spawned, despawned))
+        ops = np.concatenate((
+            np.full(int(moved.sum()), MISSILE_UPDATE),
+            np.full(len(spawned), MISSILE_SPAWN),
+            np.full(len(despawned), MISSILE_DESPAWN),
+        ))
+        values = np.concatenate((residuals[moved], spawn_positions, np.zeros((len(despawned), 2), dtype=np.int64)))
+        order = np.argsort(slots, kind='stable')
+        put_varint(out, len(slots))
+        previous = 0
+        for slot, op, (x, y) in zip(slots[order].tolist(), ops[order].tolist(), values[order].tolist()):
+            put_varint(out, (slot - previous) << 2 | op)
+            previous = slot
+            if op != MISSILE_DESPAWN:
+                put_varint(out, zigzag(x))
+                put_varint(out, zigzag(y))
+        mirror.move_missiles(staying, quantized, spawned, spawn_positions, despawned)
+        return bytes(out)
+
+    def keyframe(self) -> bytes:
+        mirror = self.mirror
+        out = bytearray()
+        put_varint(out, mirror.tick << 1 | 1)
+        put_varint(out, len(mirror.rockets))
+        for row, trail in zip(mirror.rockets.tolist(), mirror.rocket_trail.tolist()):
+            for value in row + trail:
+                put_varint(out, zigzag(value))
+        slots = np.flatnonzero(mirror.alive).tolist()
+        put_varint(out, len(slots))
+        previous = 0
+        for slot in slots:
+            put_varint(out, slot - previous)
+            previous = slot
+            for value in mirror.missiles[slot].tolist() + mirror.missile_trail[slot].tolist():
+                put_varint(out, zigzag(value))
+        return bytes(out)
+
+
+class StreamDecoder:
+    def __init__(self, rockets: int, capacity: int) -> None:
+        self.mirror = StreamMirror(rockets, capacity)
+        self.synced = False
+
+    def decode(self, data: bytes) -> None:
+        head, offset = get_varint(data, 0)
+        if head & 1:
+            self.decode_keyframe(data, head >> 1, offset)
+            self.synced = True
+        elif self.synced:
+            self.decode_delta(data, head >> 1, offset)
+
+    def decode_keyframe(self, data: bytes, tick: int, offset: int) -> None:
+        mirror = self.mirror
+        mirror.tick = tick
+        count, offset = get_varint(data, offset)
+        for index in range(count):
+            values = []
+            for _ in range(ROCKET_FIELDS + 2):
+                value, offset = get_varint(data, offset)
+                values.append(unzigzag(value))
+            mirror.rockets[index] = values[:ROCKET_FIELDS]
+            mirror.rocket_trail[index] = values[ROCKET_FIELDS:]
+        mirror.alive[:] = False
+        count, offset = get_varint(data, offset)
+        slot = 0
+        for _ in range(count):
+            step, offset = get_varint(data, offset)
+            slot += step
+            values = []
+            for _ in range(4):
+                value, offset = get_varint(data, offset)
+                values.append(unzigzag(value))
+            mirror.missiles[slot] = values[:2]
+            mirror.missile_trail[slot] = values[2:]
+            mirror.alive[slot] = True
+
+    def decode_delta(self, data: bytes, tick_step: int, offset: int) -> None:
+        mirror = self.mirror
+        mirror.tick += tick_step
+        current = mirror.predicted_rockets()
+        for index in range(len(current)):
+            changed = data[offset]
+            offset += 1
+            for field in range(ROCKET_FIELDS):
+                if changed & (1 << field):
+                    value, offset = get_varint(data, offset)
+                    current[index, field] += unzigzag(value)
+        mirror.move_rockets(current)
+        staying = np.flatnonzero(mirror.alive)
+        moved = np.zeros_like(mirror.missiles)
+        spawned: List[int] = []
+        spawn_positions: List[Tuple[int, int]] = []
+        despawned: List[int] = []
+        count, offset = get_varint(data, offset)
+        slot = 0
+        for _ in range(count):
+            record, offset = get_varint(data, offset)
+            slot += record >> 2
+            op = record & 3
+            if op == MISSILE_DESPAWN:
+                despawned.append(slot)
+                continue
+            x, offset = get_varint(data, offset)
+            y, offset = get_varint(data, offset)
+            if op == MISSILE_SPAWN:
+                spawned.append(slot)
+                spawn_positions.append((unzigzag(x), unzigzag(y)))
+            else:
+                moved[slot] = (unzigzag(x), unzigzag(y))
+        mirror.move_missiles(
+            staying, mirror.predicted_missiles(staying) + moved[staying],
+            np.array(spawned, dtype=np.intp), np.array(spawn_positions, dtype=np.int64).reshape(-1, 2),
+            np.array(despawned, dtype=np.intp),
+        )
+
+    def rocket_positions(self) -> np.ndarray:
+        return self.mirror.rockets[:, :2] / STREAM_POSITION_STEPS
+
+    def missile_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        alive = np.flatnonzero(self.mirror.alive)
+        return alive, self.mirror.missiles[alive] / STREAM_POSITION_STEPS
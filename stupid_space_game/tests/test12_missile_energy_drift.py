@@ -0,0 +1,50 @@
+import numpy as np
+from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, GRAVITY_FACTOR, SOLAR_SYSTEM
+from stupid_space_game.missiles import MissilePool
+import stupid_space_game.physics as physics
+
+TICKS = 3000
+ORBIT_RADII = [250, 350, 450, 550, 650]
+VERLET_DRIFT_BOUND = 1e-6
+
+
+def spawn_orbits(pool: MissilePool, center: np.ndarray, mass: float) -> None:
+    for radius in ORBIT_RADII:
+        speed = np.sqrt(GRAVITY_FACTOR * mass / radius)
+        pool.spawn(center[0] + radius, center[1], 0.0, speed, 0)
+
+
+def euler_energy(pool: MissilePool, centers: np.ndarray, masses: np.ndarray) -> np.ndarray:
+    position = pool.position[pool.active()].copy()
+    velocity = pool.velocity[pool.active()].copy()
+    for _ in range(TICKS):
+        velocity += physics.gravity_acceleration(position, centers, masses)
+        position += velocity
+    kinetic = 0.5 * np.einsum('ij,ij->i', velocity, velocity)
+    return kinetic + physics.gravity_potential(position, centers, masses)
+
+
+def run():
+    centers = np.array([[SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2]])
+    masses = np.array([float(SOLAR_SYSTEM['star']['mass'])])
+    pool = MissilePool(len(ORBIT_RADII))
+    spawn_orbits(pool, centers[0], masses[0])
+    start_energy = pool.energy(centers, masses)
+    euler_end_energy = euler_energy(pool, centers, masses)
+
+    worst_drift = np.zeros(len(ORBIT_RADII))
+    for _ in range(TICKS):
+        pool.update(centers, masses)
+        pool.age[:] = 1
+        drift = np.abs((pool.energy(centers, masses) - start_energy) / start_energy)
+        worst_drift = np.maximum(worst_drift, drift)
+
+    euler_drift = np.abs((euler_end_energy - start_energy) / start_energy)
+    for radius, verlet, euler in zip(ORBIT_RADII, worst_drift, euler_drift):
+        print(f"orbit {radius:4d}px  velocity-Verlet worst drift {verlet:9.2e}  explicit Euler drift {euler:9.2e}")
+    assert np.all(worst_drift < VERLET_DRIFT_BOUND)
+    assert np.all(worst_drift < euler_drift)
+
+
+if __name__ == "__main__":
+    run()
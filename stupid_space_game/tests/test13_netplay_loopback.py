@@ -0,0 +1,50 @@
+import random
+import time
+import numpy as np
+from stupid_space_game.constants import NETPLAY_PORT, TICK_RATE
+from stupid_space_game.netplay import RollbackSession, UdpLink
+from stupid_space_game.world import World
+
+TICKS = 300
+LATENCY_MS = 100
+LOSS = 0.1
+
+
+def random_masks(seed: int):
+    rng = random.Random(seed)
+    mask = 0
+    while True:
+        if rng.random() < 0.1:
+            mask = rng.randrange(32)
+        yield mask
+
+
+def test_netplay_loopback():
+    peers = [("127.0.0.1", NETPLAY_PORT), ("127.0.0.1", NETPLAY_PORT + 1)]
+    sessions = [
+        RollbackSession(World(headless=True), player, UdpLink(peers[player], peers[1 - player], LATENCY_MS, LOSS, seed=player))
+        for player in range(2)
+    ]
+    players = [random_masks(player) for player in range(2)]
+    masks = [next(player) for player in players]
+    for tick in range(TICKS):
+        deadline = time.perf_counter() + 1.0 / TICK_RATE
+        for player, session in enumerate(sessions):
+            if session.advance(masks[player]):
+                masks[player] = next(players[player])
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+    for session in sessions:
+        print(session.report())
+
+    checked = min(session.remote_confirmed for session in sessions)
+    states = [session.snapshots[checked % session.history] for session in sessions]
+    assert states[0].ticks == states[1].ticks == checked
+    assert states[0].rockets == states[1].rockets
+    assert np.array_equal(states[0].missiles.position, states[1].missiles.position)
+    print(f"Both peers agree on the world state at tick {checked}")
+    for session in sessions:
+        session.link.close()
+
+
+if __name__ == "__main__":
+    test_netplay_loopback()
@@ -0,0 +1,46 @@
+import asyncio
+import random
+from stupid_space_game.constants import SERVER_PORT
+from stupid_space_game.server import MatchServer
+from stupid_space_game.stream import FrameReader, StreamDecoder
+
+MATCHES = 64
+CLIENTS = 16
+SECONDS = 6
+
+
+async def play(match_id: int, player: int, seconds: float):
+    reader, writer = await asyncio.open_connection('127.0.0.1', SERVER_PORT)
+    writer.write(f"{match_id} {player}\n".encode())
+    rng = random.Random(match_id * 3 + player)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+    frames, received = 0, 0
+    frame_reader = FrameReader()
+    decoder = StreamDecoder(2, 1024)
+    while loop.time() < deadline:
+        data = await reader.read(4096)
+        received += len(data)
+        for payload in frame_reader.feed(data):
+            decoder.decode(payload)
+            frames += 1
+        if player > 0 and rng.random() < 0.1:
+            writer.write(bytes([rng.randrange(32)]))
+    writer.close()
+    return frames, received
+
+
+async def run():
+    server = MatchServer(list(range(MATCHES)))
+    serving = asyncio.ensure_future(server.serve('127.0.0.1', SERVER_PORT))
+    await asyncio.sleep(0.5)
+    results = await asyncio.gather(*(play(client // 2, client % 2 + 1, SECONDS) for client in range(CLIENTS)))
+    frames = sum(result[0] for result in results)
+    received = sum(result[1] for result in results)
+    print(f"{CLIENTS} clients got {frames} frames, {received / CLIENTS / SECONDS:.0f} bytes/s each")
+    print(server.report())
+    serving.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
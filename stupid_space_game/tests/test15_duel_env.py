@@ -0,0 +1,84 @@
+import time
+from typing import Tuple
+import numpy as np
+from stupid_space_game.arena import line_of_fire, missile_shot
+from stupid_space_game.controls import mask_world_control, player_shoot_check
+from stupid_space_game.constants import FULL_MANA
+from stupid_space_game.env import GravitationalDuelEnv, VectorDuelEnv, PLAYERS, X, Y, HP, MANA, rocket_rows
+from stupid_space_game.world import World
+
+ENVS = 1024
+STEPS = 200
+TRACK_SEEDS = 4
+TRACK_TICKS = 400
+TRACK_GUESS = 5
+TRACK_TOLERANCE_PX = 0.05
+
+
+def track(seed: int) -> Tuple[float, int]:
+    rng = np.random.default_rng(seed)
+    world = World(headless=True)
+    vector = VectorDuelEnv(1)
+    actions = np.zeros((1, PLAYERS, 2), dtype=np.int64)
+    actions[..., 1] = TRACK_GUESS
+    for rocket in world.rockets:
+        rocket.mana = FULL_MANA
+    vector.rockets[..., MANA] = FULL_MANA
+    worst = 0.0
+    shots = 0
+    for _ in range(TRACK_TICKS):
+        masks = rng.integers(32, size=PLAYERS)
+        actions[0, :, 0] = masks
+        shoot = player_shoot_check(masks.tolist(), world)
+        if shoot is not None:
+            shots += 1
+            length, blocked_length = line_of_fire(world, shoot - 1)
+            missile_shot(world, shoot - 1, TRACK_GUESS, length, blocked_length)
+        else:
+            mask_world_control(masks.tolist(), world)
+            world.update()
+        _, _, terminated, _, info = vector.step(actions)
+        assert info['shooters'][0] == (-1 if shoot is None else shoot - 1)
+        if terminated[0]:
+            break
+        rows = rocket_rows(world)
+        worst = max(worst, float(np.abs(rows[:, X:Y + 1] - vector.rockets[0, :, X:Y + 1]).max()))
+        assert np.array_equal(rows[:, HP], vector.rockets[0, :, HP])
+        assert world.missiles.alive.sum() == vector.missile_alive[0].sum()
+    return worst, shots
+
+
+def run():
+    errors, shots = zip(*[track(seed) for seed in range(TRACK_SEEDS)])
+    print(f"Vector env vs World over {TRACK_TICKS} ticks: max position error {max(errors):.3f} px, {sum(shots)} missile shots")
+    assert max(errors) < TRACK_TOLERANCE_PX
+    assert sum(shots) > 0
+
+    env = GravitationalDuelEnv(opponent='normal')
+    observation, _ = env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    episode_return, steps = 0.0, 0
+    while True:
+        observation, reward, terminated, truncated, _ = env.step((int(rng.integers(32)), int(rng.integers(1, 11))))
+        episode_return += reward
+        steps += 1
+        if terminated or truncated:
+            break
+    print(f"Random agent vs normal bot: return {episode_return:+.2f} after {steps} steps, observation {observation.shape}")
+
+    vector = VectorDuelEnv(ENVS)
+    vector.reset()
+    actions = np.zeros((ENVS, PLAYERS, 2), dtype=np.int64)
+    actions[..., 1] = 5
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        actions[..., 0] = rng.integers(32, size=(ENVS, PLAYERS))
+        _, _, terminated, truncated, _ = vector.step(actions)
+        episodes += int((terminated | truncated).sum())
+    elapsed = time.perf_counter() - start
+    print(f"{ENVS} vector envs: {ENVS * STEPS / elapsed:.0f} env-steps/s, {episodes} episodes finished")
+
+
+if __name__ == "__main__":
+    run()
@@ -21,12 +21,14 @@ def test_draw_planet():
     font = pygame.font.Font(None, 36)
     
     clock = pygame.time.Clock()
+    tick = 0
     while True:
+        tick += 1
         screen.fill((0, 0, 0))
         for num, (celestial, cid) in enumerate(zip(celesital_graphics, celestial_ids)):
             pos_x = (num+2)*250
             pos_y = 200
-            celestial.draw(screen, pygame.math.Vector2(pos_x, pos_y))
+            celestial.draw(screen, pygame.math.Vector2(pos_x, pos_y), graphics.View(tick=tick))
             
             # Render and draw caption
             text = font.render(cid, True, (255, 255, 255))
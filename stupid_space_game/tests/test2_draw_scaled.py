@@ -11,12 +11,14 @@ def test_draw_planet():
     font = pygame.font.Font(None, 36)
     
     clock = pygame.time.Clock()
+    tick = 0
     while True:
+        tick += 1
         screen.fill((0, 0, 0))
         for num, (celestial, radius) in enumerate(zip(celesitals, radii)):
             pos_x = (num+2)*250
             pos_y = 1000
-            celestial.draw(screen, pygame.math.Vector2(pos_x, pos_y))
+            celestial.draw(screen, pygame.math.Vector2(pos_x, pos_y), graphics.View(tick=tick))
             
             # Render and draw caption
             text = font.render(f"{radius}", True, (255, 255, 255))
@@ -0,0 +1,79 @@
+import json
+import os
+import time
+from typing import List, Union
+from stupid_space_game.constants import TRACE_CAPACITY
+
+
+class NullSpan:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+class TraceBuffer:
+    def __init__(self, capacity: int = TRACE_CAPACITY) -> None:
+        self.capacity = capacity
+        self.names: List[str] = [''] * capacity
+        self.starts: List[float] = [0.0] * capacity
+        self.durations: List[float] = [-1.0] * capacity
+        self.count = 0
+        self.open_slots: List[int] = []
+        self.pending_name = ''
+        self.origin = time.perf_counter()
+
+    def span(self, name: str) -> 'TraceBuffer':
+        self.pending_name = name
+        return self
+
+    def __enter__(self) -> None:
+        slot = self.count % self.capacity
+        self.count += 1
+        while slot in self.open_slots:
+            slot = self.count % self.capacity
+            self.count += 1
+        self.names[slot] = self.pending_name
+        self.durations[slot] = -1.0
+        self.open_slots.append(slot)
+        self.starts[slot] = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        end = time.perf_counter()
+        slot = self.open_slots.pop()
+        self.durations[slot] = end - self.starts[slot]
+
+    def flush(self, path: str) -> None:
+        pid = os.getpid()
+        first = max(0, self.count - self.capacity)
+        events = []
+        for index in range(first, self.count):
+            slot = index % self.capacity
+            if self.durations[slot] < 0:
+                continue
+            events.append({
+                "name": self.names[slot],
+                "cat": self.names[slot].split('.')[0],
+                "ph": "X",
+                "ts": (self.starts[slot] - self.origin) * 1e6,
+                "dur": self.durations[slot] * 1e6,
+                "pid": pid,
+                "tid": 1,
+            })
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+        print(f"Trace with {len(events)} spans written to {path}")
+
+
+class NullTrace:
+    def span(self, name: str) -> NullSpan:
+        return NULL_SPAN
+
+    def flush(self, path: str) -> None:
+        return None
+
+
+NULL_SPAN = NullSpan()
+NULL_TRACE = NullTrace()
+Tracer = Union[TraceBuffer, NullTrace]
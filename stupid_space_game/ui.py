@@ -1,5 +1,11 @@
 import pygame
-from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+import numpy as np
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from stupid_space_game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, DEFAULT_HP, MINIMAP_REFRESH, MINIMAP_WIDTH, MINIMAP_MARGIN
+from stupid_space_game.constants import MINIMAP_ALPHA, MINIMAP_ROCKET_RADIUS, COLOR_MINIMAP_BACKGROUND, COLOR_MINIMAP_ORBIT
+from stupid_space_game.constants import COLOR_MINIMAP_STAR, COLOR_MINIMAP_BODY, COLOR_MINIMAP_VIEWPORT
+if TYPE_CHECKING:
+    from stupid_space_game.rockets import Rocket
 
 GAME_FONT: pygame.font.Font = None
 LARGE_FONT: pygame.font.Font = None
@@ -23,6 +29,10 @@ TOP_MARGIN = 20
 SIDE_MARGIN = 20
 BORDER_THICKNESS = 3
 BAR_WIDTH_PERCENT = 0.4 # Percentage of screen width for each bar
+HEALTH_COLORS = (COLOR_HEALTH_P1, COLOR_HEALTH_P2)
+
+# Glyphs pre-rendered into the HUD number atlas
+ATLAS_GLYPHS = "0123456789%"
 
 def ui_init():
     global GAME_FONT, LARGE_FONT, numbers_ui
@@ -70,82 +80,150 @@ def get_numbers_ui():
     return numbers_ui
 
 
-def draw_fighter_ui(screen, 
-                    health1, max_health1, mana1, 
-                    health2, max_health2, mana2):
-    screen_width = screen.get_width()
-    bar_max_width = int(screen_width * BAR_WIDTH_PERCENT)
-
-    # --- Input Validation / Clamping ---
-    current_health1 = max(0, health1)
-    current_mana1 = max(0, mana1)
-    current_health2 = max(0, health2)
-    current_mana2 = max(0, mana2)
-
-
-
-    # --- Calculate Ratios ---
-    health_ratio1 = current_health1 / max_health1
-    health_ratio2 = current_health2 / max_health2
-
-    # --- Calculate Bar Widths ---
-    current_bar_width1 = int(bar_max_width * health_ratio1)
-    current_bar_width2 = int(bar_max_width * health_ratio2)
-
-    # --- Define Bar Rectangles (Same as before) ---
-    # Player 1 (Left)
-    bg_rect1 = pygame.Rect(SIDE_MARGIN, TOP_MARGIN, bar_max_width, BAR_HEIGHT)
-    health_rect1 = pygame.Rect(SIDE_MARGIN, TOP_MARGIN, current_bar_width1, BAR_HEIGHT)
-    border_rect1 = pygame.Rect(
-        SIDE_MARGIN - BORDER_THICKNESS,
-        TOP_MARGIN - BORDER_THICKNESS,
-        bar_max_width + (BORDER_THICKNESS * 2),
-        BAR_HEIGHT + (BORDER_THICKNESS * 2)
-    )
-    # Player 2 (Right)
-    bg_rect2_x = screen_width - SIDE_MARGIN - bar_max_width
-    bg_rect2 = pygame.Rect(bg_rect2_x, TOP_MARGIN, bar_max_width, BAR_HEIGHT)
-    health_rect2_x = screen_width - SIDE_MARGIN - current_bar_width2
-    health_rect2 = pygame.Rect(health_rect2_x, TOP_MARGIN, current_bar_width2, BAR_HEIGHT)
-    border_rect2 = pygame.Rect(
-        bg_rect2_x - BORDER_THICKNESS,
-        TOP_MARGIN - BORDER_THICKNESS,
-        bar_max_width + (BORDER_THICKNESS * 2),
-        BAR_HEIGHT + (BORDER_THICKNESS * 2)
-    )
-
-    # --- Draw Health Bars (Same as before) ---
-    pygame.draw.rect(screen, COLOR_BORDER, border_rect1)
-    pygame.draw.rect(screen, COLOR_DEPLETED, bg_rect1)
-    pygame.draw.rect(screen, COLOR_HEALTH_P1, health_rect1)
-
-    pygame.draw.rect(screen, COLOR_BORDER, border_rect2)
-    pygame.draw.rect(screen, COLOR_DEPLETED, bg_rect2)
-    pygame.draw.rect(screen, COLOR_HEALTH_P2, health_rect2)
-
-    # --- Mana Text ---
-
-    # Format Text Strings
-    mana_text_str1 = f"{int(mana1)}%"
-    mana_text_str2 = f"{int(mana2)}%"
-
-    # Render Text Surfaces (Anti-aliased)
-    mana_surf1 = GAME_FONT.render(mana_text_str1, True, COLOR_MANA_TEXT)
-    mana_surf2 = GAME_FONT.render(mana_text_str2, True, COLOR_MANA_TEXT)
-
-    # Get Text Rects and Position Them
-    mana_rect1 = mana_surf1.get_rect()
-    mana_rect2 = mana_surf2.get_rect()
-
-    # Position P1 text to the right of P1 health bar
-    mana_rect1.midleft = (border_rect1.right + TEXT_PADDING, border_rect1.centery)
-
-    # Position P2 text to the left of P2 health bar
-    mana_rect2.midright = (border_rect2.left - TEXT_PADDING, border_rect2.centery)
-
-    # Blit Mana Text
-    screen.blit(mana_surf1, mana_rect1)
-    screen.blit(mana_surf2, mana_rect2)
+class NumberAtlas:
+    def __init__(self, font: pygame.font.Font, color: Tuple[int, int, int]) -> None:
+        glyph_surfaces = [font.render(glyph, True, color) for glyph in ATLAS_GLYPHS]
+        self.height = max(surface.get_height() for surface in glyph_surfaces)
+        self.atlas = pygame.Surface((sum(surface.get_width() for surface in glyph_surfaces), self.height), pygame.SRCALPHA)
+        self.glyph_rects: Dict[str, pygame.Rect] = {}
+        x = 0
+        for glyph, surface in zip(ATLAS_GLYPHS, glyph_surfaces):
+            self.atlas.blit(surface, (x, 0))
+            self.glyph_rects[glyph] = pygame.Rect(x, 0, surface.get_width(), self.height)
+            x += surface.get_width()
+        self.percent_labels: List[pygame.Surface] = [self.compose(f"{value}%") for value in range(101)]
+        self.max_label_width = max(label.get_width() for label in self.percent_labels)
+
+    def compose(self, text: str) -> pygame.Surface:
+        rects = [self.glyph_rects[glyph] for glyph in text]
+        label = pygame.Surface((sum(rect.width for rect in rects), self.height), pygame.SRCALPHA)
+        x = 0
+        for rect in rects:
+            label.blit(self.atlas, (x, 0), rect)
+            x += rect.width
+        return label
+
+    def percent(self, value: int) -> pygame.Surface:
+        return self.percent_labels[min(100, max(0, value))]
+
+
+class FighterPanel:
+    def __init__(self, atlas: NumberAtlas, health_color: Tuple[int, int, int], x: int, y: int, bar_width: int, align_right: bool) -> None:
+        self.atlas = atlas
+        self.health_color = health_color
+        self.bar_width = bar_width
+        self.align_right = align_right
+        border_width = bar_width + 2 * BORDER_THICKNESS
+        border_height = BAR_HEIGHT + 2 * BORDER_THICKNESS
+        width = border_width + TEXT_PADDING + atlas.max_label_width
+        height = max(border_height, atlas.height)
+        border_x = width - border_width if align_right else 0
+        self.border_rect = pygame.Rect(border_x, (height - border_height) // 2, border_width, border_height)
+        self.bar_rect = self.border_rect.inflate(-2 * BORDER_THICKNESS, -2 * BORDER_THICKNESS)
+        panel_x = x + BORDER_THICKNESS - width if align_right else x - BORDER_THICKNESS
+        self.position = (panel_x, y - BORDER_THICKNESS - self.border_rect.top)
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.shown: Optional[Tuple[int, int]] = None
+
+    def render(self, health: int, max_health: float, mana: int) -> None:
+        self.surface.fill((0, 0, 0, 0))
+        pygame.draw.rect(self.surface, COLOR_BORDER, self.border_rect)
+        pygame.draw.rect(self.surface, COLOR_DEPLETED, self.bar_rect)
+        health_width = int(self.bar_width * health / max_health)
+        health_rect = self.bar_rect.copy()
+        health_rect.width = health_width
+        if self.align_right:
+            health_rect.right = self.bar_rect.right
+        pygame.draw.rect(self.surface, self.health_color, health_rect)
+        label = self.atlas.percent(mana)
+        label_rect = label.get_rect()
+        if self.align_right:
+            label_rect.midright = (self.border_rect.left - TEXT_PADDING, self.border_rect.centery)
+        else:
+            label_rect.midleft = (self.border_rect.right + TEXT_PADDING, self.border_rect.centery)
+        self.surface.blit(label, label_rect)
+
+    def draw(self, screen: pygame.Surface, health: float, max_health: float, mana: float) -> None:
+        shown = (int(max(0, health)), int(max(0, mana)))
+        if shown != self.shown:
+            self.render(shown[0], max_health, shown[1])
+            self.shown = shown
+        screen.blit(self.surface, self.position)
+
+
+class FighterHud:
+    def __init__(self, screen_width: int, players: int = 2) -> None:
+        atlas = NumberAtlas(GAME_FONT, COLOR_MANA_TEXT)
+        bar_width = int(screen_width * BAR_WIDTH_PERCENT)
+        row_height = BAR_HEIGHT + 2 * BORDER_THICKNESS + TOP_MARGIN
+        self.panels: List[FighterPanel] = []
+        for player in range(players):
+            align_right = player % 2 == 1
+            x = screen_width - SIDE_MARGIN if align_right else SIDE_MARGIN
+            y = TOP_MARGIN + (player // 2) * row_height
+            color = HEALTH_COLORS[player % len(HEALTH_COLORS)]
+            self.panels.append(FighterPanel(atlas, color, x, y, bar_width, align_right))
+
+    def draw(self, screen: pygame.Surface, rockets: List['Rocket']) -> None:
+        for panel, rocket in zip(self.panels, rockets):
+            panel.draw(screen, rocket.hp, DEFAULT_HP, rocket.mana)
+
+
+class Minimap:
+    def __init__(
+        self,
+        world_bounds: pygame.Rect,
+        static_orbits: List[Tuple[Tuple[float, float], float]],
+        fixed_bodies: List[Tuple[Tuple[float, float], float]],
+    ) -> None:
+        self.origin = np.array(world_bounds.topleft, dtype=float)
+        self.scale = MINIMAP_WIDTH / world_bounds.width
+        size = (MINIMAP_WIDTH, max(1, round(world_bounds.height * self.scale)))
+        self.position = (SCREEN_WIDTH - MINIMAP_MARGIN - size[0], SCREEN_HEIGHT - MINIMAP_MARGIN - size[1])
+        self.base = pygame.Surface(size)
+        self.base.fill(COLOR_MINIMAP_BACKGROUND)
+        for center, radius in static_orbits:
+            pygame.draw.circle(self.base, COLOR_MINIMAP_ORBIT, self.to_map(center), max(1, radius * self.scale), 1)
+        for center, radius in fixed_bodies:
+            pygame.draw.circle(self.base, COLOR_MINIMAP_STAR, self.to_map(center), max(2, radius * self.scale))
+        pygame.draw.rect(self.base, COLOR_BORDER, self.base.get_rect(), 1)
+        self.surface = self.base.copy()
+        self.surface.set_alpha(MINIMAP_ALPHA)
+        self.body_color = self.surface.map_rgb(COLOR_MINIMAP_BODY)
+        self.frames_since_refresh = MINIMAP_REFRESH
+
+    def to_map(self, point: Tuple[float, float]) -> Tuple[float, float]:
+        return (point[0] - self.origin[0]) * self.scale, (point[1] - self.origin[1]) * self.scale
+
+    def render(self, bodies: np.ndarray, rockets: List['Rocket'], viewports: List[Tuple[float, float, float, float]]) -> None:
+        self.surface.blit(self.base, (0, 0))
+        width, height = self.surface.get_size()
+        dots = ((bodies - self.origin) * self.scale).astype(np.intp)
+        dots = dots[(dots[:, 0] >= 0) & (dots[:, 0] < width - 1) & (dots[:, 1] >= 0) & (dots[:, 1] < height - 1)]
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            pixels[dots[:, 0] + dx, dots[:, 1] + dy] = self.body_color
+        del pixels
+        for viewport in viewports:
+            left, top = self.to_map(viewport[:2])
+            right, bottom = self.to_map(viewport[2:])
+            pygame.draw.rect(self.surface, COLOR_MINIMAP_VIEWPORT, pygame.Rect(left, top, right - left, bottom - top), 1)
+        for index, rocket in enumerate(rockets):
+            color = HEALTH_COLORS[index % len(HEALTH_COLORS)]
+            pygame.draw.circle(self.surface, color, self.to_map((rocket.position.x, rocket.position.y)), MINIMAP_ROCKET_RADIUS)
+
+    def draw(
+        self,
+        screen: pygame.Surface,
+        bodies: np.ndarray,
+        rockets: List['Rocket'],
+        viewports: List[Tuple[float, float, float, float]],
+    ) -> None:
+        self.frames_since_refresh += 1
+        if self.frames_since_refresh >= MINIMAP_REFRESH:
+            self.render(bodies, rockets, viewports)
+            self.frames_since_refresh = 0
+        screen.blit(self.surface, self.position)
 
 
 def show_full_screen(screen, filepath):
@@ -1,48 +1,117 @@
-from typing import Optional, Tuple, List
+from typing import NamedTuple, Optional, Tuple, List
 import pygame
+import numpy as np
 import stupid_space_game.graphics as graphics
 from stupid_space_game.constants import SOLAR_SYSTEM, ORBITING_SPEED_FACTOR, SCREEN_WIDTH, SCREEN_HEIGHT
+from stupid_space_game.constants import ROCKET_RADIUS, MISSILE_RADIUS, MISSILE_SPEED, MISSILE_DAMAGE, FIRE_COOLDOWN_TICKS
+from stupid_space_game.constants import LARGE_WORLD_SCREENS, PARTICLE_CAPACITY, SPRITE_CULL_MARGIN
 import math
 from stupid_space_game.celestials import CelestialEntity
-from stupid_space_game.rockets import Rocket
+from stupid_space_game.rockets import Rocket, RocketState
+from stupid_space_game.missiles import MissilePool, MissileState
+import stupid_space_game.particles as particles
+from stupid_space_game.profiler import FrameProfiler
 import stupid_space_game.physics as physics
-from stupid_space_game.constants import DEFAULT_HP
-from stupid_space_game.ui import draw_fighter_ui
+import stupid_space_game.camera as camera
+import stupid_space_game.trace as trace
+
+
+def large_world_bounds() -> pygame.Rect:
+    bounds = pygame.Rect(0, 0, SCREEN_WIDTH * LARGE_WORLD_SCREENS, SCREEN_HEIGHT * LARGE_WORLD_SCREENS)
+    bounds.center = (SOLAR_SYSTEM['star']['position']['x'], SOLAR_SYSTEM['star']['position']['y'])
+    return bounds
+
+
+class WorldSnapshot(NamedTuple):
+    ticks: int
+    orbit_angles: List[float]
+    rockets: List[RocketState]
+    missiles: MissileState
+
 
 class World:
-    def __init__(self):
+    def __init__(self, bounds: Optional[pygame.Rect] = None, headless: bool = False, tracer: trace.Tracer = trace.NULL_TRACE):
+        self.tracer = tracer
+        self.bounds = bounds if bounds is not None else pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.headless = headless
+        self.effects = not headless
         self._celestials: List[CelestialEntity] = []
+        self.ticks = 0
         self._initialize_solar_system()
         self.rocket1 = Rocket(
             x=SCREEN_WIDTH // 4,
             y=2 * SCREEN_HEIGHT // 3,
             rotation=270,
+            bounds=self.bounds,
+            headless=headless,
+            tracer=tracer,
         )
         self.rocket2 = Rocket(
             x=3 * SCREEN_WIDTH // 4, 
             y=1 * SCREEN_HEIGHT // 3,
             rotation=90,
+            bounds=self.bounds,
+            headless=headless,
+            tracer=tracer,
         )
+        self.rockets: List[Rocket] = [self.rocket1, self.rocket2]
+        self.missiles = MissilePool(bounds=self.bounds)
+        self.particles = particles.ParticlePool(capacity=1 if headless else PARTICLE_CAPACITY)
+        if not headless:
+            self.missile_graphics = graphics.MissileGraphics()
+            self.particle_graphics = graphics.ParticleGraphics(
+                [(emitter.size, emitter.tint) for emitter in particles.EMITTERS]
+            )
+            self.render_queue = graphics.RenderQueue(self.tracer)
+            self.orbit_rings = graphics.OrbitRingLayer(self.tracer)
+            self.draw_radii = np.array([
+                max(celestial.graphics.radius, celestial.corona.radius if celestial.corona is not None else 0)
+                for celestial in self._celestials
+            ], dtype=float)
+        self.orbiters = [index for index, celestial in enumerate(self._celestials) if celestial.orbit_parent is not None]
+        self.orbit_parents = [self._celestials.index(self._celestials[index].orbit_parent) for index in self.orbiters]
+        self.orbit_radii = np.array([self._celestials[index].orbit_radius for index in self.orbiters], dtype=float)
+        self.start_angles = [celestial.orbit_angle for celestial in self._celestials]
+        self.parent_indices = np.array([
+            self._celestials.index(celestial.orbit_parent) if celestial.orbit_parent is not None else -1
+            for celestial in self._celestials
+        ])
+        depths: List[int] = []
+        for parent in self.parent_indices.tolist():
+            depths.append(depths[parent] + 1 if parent >= 0 else 0)
+        self.orbit_depth = max(depths)
+        self.all_orbit_radii = np.array([celestial.orbit_radius for celestial in self._celestials], dtype=float)
+        self.orbit_speeds = np.array([ORBITING_SPEED_FACTOR * celestial.angular_velocity for celestial in self._celestials])
+        self.celestial_masses = np.array([celestial.mass for celestial in self._celestials], dtype=float)
+        self.celestial_radii = np.array([celestial.radius for celestial in self._celestials], dtype=float)
+        self.drawn_tick = -1
+        self.drawn_centers = np.zeros((0, 2))
+        self.drawn_boxes = np.zeros((0, 4))
     
     def _initialize_solar_system(self):
         star_data = SOLAR_SYSTEM['star']
         star_radius = star_data['size'] // 2
-        star_graphics = graphics.CelestialBodyGraphics(
+        star_graphics = None if self.headless else graphics.CelestialBodyGraphics(
             star_data['sprite_id'], 
-            2*star_radius # the specific sprite of the star is 2x the others 
+            2*star_radius, # the specific sprite of the star is 2x the others 
+            phase=len(self._celestials),
+            tracer=self.tracer,
         )
         
         self.star = CelestialEntity(
             x=star_data['position']['x'],
             y=star_data['position']['y'],
             radius=star_data['size'] // 2,
-            graphics=star_graphics
+            graphics=star_graphics,
+            name='star',
+            mass=star_data['mass'],
+            corona=None if self.headless else graphics.CoronaGraphics(star_graphics.radius, self.tracer),
         )
         self._celestials.append(self.star)
         
-        for planet_data in SOLAR_SYSTEM['planets']:
+        for planet_index, planet_data in enumerate(SOLAR_SYSTEM['planets']):
             planet_radius = planet_data['size'] // 2
-            planet_graphics = graphics.CelestialBodyGraphics(planet_data['sprite_id'], planet_radius)
+            planet_graphics = None if self.headless else graphics.CelestialBodyGraphics(planet_data['sprite_id'], planet_radius, len(self._celestials), self.tracer)
             
             # Create the planet as a CelestialEntity
             planet = CelestialEntity(
@@ -53,16 +122,18 @@ class World:
                 orbit_parent=self.star,
                 orbit_radius=planet_data['orbit_radius'],
                 angular_velocity=planet_data['angular_velocity'],
-                orbit_angle=planet_data['start_angle']
+                orbit_angle=planet_data['start_angle'],
+                name=f"planet{planet_index}",
+                mass=planet_data['mass'],
             )
             self.star.moons.append(planet)
             self._celestials.append(planet)
             
             # Create all moons for this planet
             planet_moons = []
-            for moon_data in planet_data.get('moons', []):
+            for moon_index, moon_data in enumerate(planet_data.get('moons', [])):
                 moon_radius = moon_data['size'] // 2
-                moon_graphics = graphics.CelestialBodyGraphics(moon_data['sprite_id'], moon_radius)
+                moon_graphics = None if self.headless else graphics.CelestialBodyGraphics(moon_data['sprite_id'], moon_radius, len(self._celestials), self.tracer)
                 
                 # Create the moon as a CelestialEntity
                 moon = CelestialEntity(
@@ -74,40 +145,264 @@ class World:
                     orbit_radius=moon_data['orbit_radius'],
                     angular_velocity=moon_data['angular_velocity'],
                     orbit_angle=moon_data['start_angle'],
+                    name=f"planet{planet_index}.moon{moon_index}",
+                    mass=moon_data['mass'],
                 )
                 planet_moons.append(moon)
                 self._celestials.append(moon)
             planet.moons = planet_moons
     
     def update(self):
-        self.star.update()
-        self.rocket1.update()
-        self.rocket2.update()
-        
-        for celestial in self._celestials:
-            if physics.check_rocket_celestial_collision(self.rocket1, celestial):
-                physics.resolve_rocket_celestial_collision(self.rocket1, celestial)
-                break
-        for celestial in self._celestials:
-            if physics.check_rocket_celestial_collision(self.rocket2, celestial):
-                physics.resolve_rocket_celestial_collision(self.rocket2, celestial)
-                break
-    
-    def draw(self, screen: pygame.Surface):
-        self.star.draw(screen)
-        self.rocket1.draw(screen)
-        self.rocket2.draw(screen)
-        draw_fighter_ui(
-            screen, 
-            self.rocket1.hp, 
-            DEFAULT_HP, 
-            self.rocket1.mana,
-            self.rocket2.hp, 
-            DEFAULT_HP,
-            self.rocket2.mana)
+        with self.tracer.span("world.update"):
+            self.ticks += 1
+            with self.tracer.span("world.orbits"):
+                self.star.update()
+            with self.tracer.span("world.rockets"):
+                self.rocket1.update()
+                self.rocket2.update()
 
+            with self.tracer.span("physics.collisions"):
+                for celestial in self._celestials:
+                    if physics.check_rocket_celestial_collision(self.rocket1, celestial):
+                        physics.resolve_rocket_celestial_collision(self.rocket1, celestial, self.tracer)
+                        self.emit_collision_sparks(self.rocket1, celestial)
+                        break
+                for celestial in self._celestials:
+                    if physics.check_rocket_celestial_collision(self.rocket2, celestial):
+                        physics.resolve_rocket_celestial_collision(self.rocket2, celestial, self.tracer)
+                        self.emit_collision_sparks(self.rocket2, celestial)
+                        break
 
+            with self.tracer.span("world.missiles"):
+                self.update_missiles()
 
+            if self.effects:
+                with self.tracer.span("world.particles"):
+                    self.emit_exhaust()
+                    self.particles.update()
 
+    def future_orbits(self, steps: int, stride: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        angles = np.array([celestial.orbit_angle for celestial in self._celestials])
+        angles = angles + np.arange(stride, steps * stride + 1, stride)[:, np.newaxis] * self.orbit_speeds
+        directions = np.stack((np.cos(angles), np.sin(angles)), axis=-1)
+        offsets = directions * self.all_orbit_radii[:, np.newaxis]
+        moving = self.parent_indices >= 0
+        centers = offsets.copy()
+        centers[:, ~moving] = self.celestial_centers()[~moving]
+        for _ in range(self.orbit_depth):
+            centers[:, moving] = offsets[:, moving] + centers[:, self.parent_indices[moving]]
+        velocities = directions * (self.orbit_speeds * self.all_orbit_radii)[:, np.newaxis]
+        return centers, velocities
 
+    def orbit_velocities(self) -> np.ndarray:
+        angles = np.array([celestial.orbit_angle for celestial in self._celestials])
+        return np.stack((np.cos(angles), np.sin(angles)), axis=-1) * (self.orbit_speeds * self.all_orbit_radii)[:, np.newaxis]
+
+    def place_orbits(self, tick: int) -> None:
+        self.ticks = tick
+        for celestial, start_angle in zip(self._celestials, self.start_angles):
+            celestial.orbit_angle = start_angle + tick * ORBITING_SPEED_FACTOR * celestial.angular_velocity
+            celestial.place()
+
+    def snapshot(self) -> WorldSnapshot:
+        return WorldSnapshot(
+            self.ticks,
+            [celestial.orbit_angle for celestial in self._celestials],
+            [rocket.state() for rocket in self.rockets],
+            self.missiles.state(),
+        )
+
+    def restore(self, snapshot: WorldSnapshot) -> None:
+        self.ticks = snapshot.ticks
+        for celestial, orbit_angle in zip(self._celestials, snapshot.orbit_angles):
+            celestial.orbit_angle = orbit_angle
+            celestial.place()
+        for rocket, state in zip(self.rockets, snapshot.rockets):
+            rocket.restore(state)
+        self.missiles.restore(snapshot.missiles)
+
+    def emit_exhaust(self):
+        burning = [rocket for rocket in self.rockets if rocket.thrusters]
+        if not burning:
+            return
+        headings = np.radians([rocket.rotation for rocket in burning])
+        nozzles = np.array([(rocket.position.x, rocket.position.y) for rocket in burning])
+        nozzles[:, 0] -= np.sin(headings) * ROCKET_RADIUS
+        nozzles[:, 1] += np.cos(headings) * ROCKET_RADIUS
+        self.particles.emit(
+            particles.THRUSTER_EXHAUST,
+            nozzles,
+            np.array([(rocket.velocity.x, rocket.velocity.y) for rocket in burning]),
+            np.arctan2(np.cos(headings), -np.sin(headings)),
+        )
+
+    def emit_collision_sparks(self, rocket: Rocket, celestial: CelestialEntity):
+        if not self.effects:
+            return
+        normal = rocket.position - celestial.position
+        if normal.length() == 0:
+            return
+        normal = normal.normalize()
+        contact = celestial.position + normal * celestial.radius
+        self.particles.emit(
+            particles.COLLISION_SPARKS,
+            np.array([(contact.x, contact.y)]),
+            np.zeros((1, 2)),
+            np.array([math.atan2(normal.y, normal.x)]),
+        )
 
+    def emit_impacts(self, indices: np.ndarray):
+        if len(indices) == 0 or not self.effects:
+            return
+        self.particles.emit(
+            particles.MISSILE_IMPACT,
+            self.missiles.position[indices],
+            self.missiles.velocity[indices] * 0.2,
+            np.zeros(len(indices)),
+        )
+
+    def fire(self, shooter: int) -> bool:
+        rocket = self.rockets[shooter]
+        if rocket.fire_cooldown > 0:
+            return False
+        heading = math.radians(rocket.rotation)
+        direction = pygame.math.Vector2(math.sin(heading), -math.cos(heading))
+        muzzle = rocket.position + direction * (ROCKET_RADIUS + MISSILE_RADIUS + 1)
+        velocity = rocket.velocity + direction * MISSILE_SPEED
+        if self.missiles.spawn(muzzle.x, muzzle.y, velocity.x, velocity.y, shooter) < 0:
+            return False
+        rocket.fire_cooldown = FIRE_COOLDOWN_TICKS
+        return True
+
+    def celestial_centers(self) -> np.ndarray:
+        return np.array([(celestial.position.x, celestial.position.y) for celestial in self._celestials])
+
+    def static_orbits(self) -> List[Tuple[Tuple[float, float], float]]:
+        return [
+            ((celestial.orbit_parent.position.x, celestial.orbit_parent.position.y), celestial.orbit_radius)
+            for celestial in self._celestials
+            if celestial.orbit_parent is not None and celestial.orbit_parent.orbit_parent is None
+        ]
+
+    def fixed_bodies(self) -> List[Tuple[Tuple[float, float], float]]:
+        return [
+            ((celestial.position.x, celestial.position.y), celestial.radius)
+            for celestial in self._celestials
+            if celestial.orbit_parent is None
+        ]
+
+    def celestial_borders(self) -> np.ndarray:
+        return np.array([celestial.broad_borders for celestial in self._celestials])
+
+    def raycast_many(
+        self,
+        origins: np.ndarray,
+        directions: np.ndarray,
+        max_lengths: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        with self.tracer.span("physics.raycast"):
+            return physics.raycast_many(
+                origins, directions, max_lengths,
+                self.celestial_borders(), self.celestial_centers(), self.celestial_radii,
+            )
+
+    def raycast(
+        self,
+        origin: pygame.math.Vector2,
+        direction: pygame.math.Vector2,
+        max_length: float,
+    ) -> Optional[Tuple[float, CelestialEntity]]:
+        hit = physics.raycast(
+            (origin.x, origin.y), (direction.x, direction.y), max_length,
+            self.celestial_borders(), self.celestial_centers(), self.celestial_radii,
+        )
+        if hit is None:
+            return None
+        distance, body = hit
+        return distance, self._celestials[body]
+
+    def update_missiles(self):
+        self.missiles.update(self.celestial_centers(), self.celestial_masses)
+        active = self.missiles.active()
+        if len(active) == 0:
+            return
+        for index, rocket in enumerate(self.rockets):
+            candidates = active[self.missiles.owner[active] != index]
+            rows, _ = physics.circle_hits(
+                self.missiles.position[candidates],
+                MISSILE_RADIUS,
+                np.array([rocket.broad_borders]),
+                np.array([(rocket.position.x, rocket.position.y)]),
+                np.array([ROCKET_RADIUS]),
+            )
+            if len(rows) > 0:
+                rocket.hp = max(0, rocket.hp - MISSILE_DAMAGE * len(rows))
+                self.emit_impacts(candidates[rows])
+                self.missiles.release(candidates[rows])
+        active = self.missiles.active()
+        if len(active) == 0:
+            return
+        rows, _ = physics.circle_hits(
+            self.missiles.position[active],
+            MISSILE_RADIUS,
+            self.celestial_borders(),
+            self.celestial_centers(),
+            self.celestial_radii,
+        )
+        self.emit_impacts(active[rows])
+        self.missiles.release(active[rows])
+    
+    def draw(
+        self,
+        screen: pygame.Surface,
+        view: graphics.View = graphics.FULL_VIEW,
+        profiler: Optional[FrameProfiler] = None,
+    ):
+        with self.tracer.span("world.draw"):
+            view = view._replace(tick=self.ticks)
+            queue = self.render_queue
+            width, height = screen.get_size()
+            viewport = (view.camera_x, view.camera_y, view.camera_x + width / view.scale, view.camera_y + height / view.scale)
+            padded = (
+                viewport[0] - SPRITE_CULL_MARGIN, viewport[1] - SPRITE_CULL_MARGIN,
+                viewport[2] + SPRITE_CULL_MARGIN, viewport[3] + SPRITE_CULL_MARGIN,
+            )
+            if self.drawn_tick != self.ticks:
+                centers = self.celestial_centers()
+                self.drawn_boxes = np.concatenate((centers - self.draw_radii[:, np.newaxis], centers + self.draw_radii[:, np.newaxis]), axis=1)
+                self.drawn_centers = centers
+                self.drawn_tick = self.ticks
+            centers = self.drawn_centers
+            if view.orbit_rings and self.orbiters:
+                ring_centers = centers[self.orbit_parents]
+                ringed = camera.visible_rings(ring_centers, self.orbit_radii, viewport)
+                if ringed.any():
+                    queue.extend(graphics.LAYER_ORBITS, [self.orbit_rings.sprite(
+                        (width, height), ring_centers[ringed], self.orbit_radii[ringed], view,
+                    )])
+            visible = camera.visible_boxes(self.drawn_boxes, viewport)
+            queue.cull(len(visible) - int(visible.sum()))
+            for index in np.flatnonzero(visible).tolist():
+                self._celestials[index].draw(queue, view)
+            live = self.particles.live()
+            shown = live[camera.visible_boxes(np.tile(self.particles.position[live], 2), padded)]
+            queue.extend(graphics.LAYER_PARTICLES, self.particle_graphics.sprites(
+                self.particles.position[shown],
+                self.particles.kind[shown],
+                self.particles.age[shown],
+                self.particles.lifetime[shown],
+                view,
+            ))
+            for rocket in self.rockets:
+                rocket.draw(queue, view)
+            active = self.missiles.active()
+            for index in active[camera.visible_boxes(np.tile(self.missiles.position[active], 2), padded)].tolist():
+                x, y = self.missiles.position[index]
+                vx, vy = self.missiles.velocity[index]
+                queue.push(graphics.LAYER_MISSILES, *self.missile_graphics.sprite((x, y), math.degrees(math.atan2(vx, -vy)), view))
+            if profiler is not None:
+                profiler.mark("world.draw.queue")
+            queue.flush(screen, profiler)
+            if profiler is not None:
+                profiler.count("blits", queue.submitted)
+                profiler.count("culled", queue.culled)